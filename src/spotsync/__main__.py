@@ -1,18 +1,20 @@
 """Main entry point for SpotSync."""
 
 import sys
-import typer
-from .cli import app as cli_app
-from .tui import main as tui_main
 
 
 def main():
-    """Main entry point that routes to CLI or TUI."""
+    """Main entry point that routes to CLI or TUI.
+    
+    Imports are deferred so that only the selected interface is loaded.
+    """
     if len(sys.argv) == 1:
         # No arguments provided, launch TUI
+        from .tui import main as tui_main
         tui_main()
     else:
         # Arguments provided, use CLI
+        from .cli import app as cli_app
         cli_app()
 
 
@@ -0,0 +1,110 @@
+"""Persistent cache for Spotify API responses."""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+
+# Entries older than this are purged when the cache is opened
+MAX_ENTRY_AGE = 30 * 24 * 3600
+
+# Recently used entries kept decoded in memory, in front of the database
+MEMORY_ENTRIES = 4096
+
+
+def get_cache_path() -> Path:
+    """Get the path to the response cache database."""
+    cache_dir = Path.home() / ".spotsync"
+    cache_dir.mkdir(exist_ok=True)
+    return cache_dir / "cache.db"
+
+
+class ResponseCache:
+    """SQLite-backed store of JSON-serializable API responses.
+
+    Each entry records when it was written; readers pass the maximum age they
+    accept, so different kinds of responses can use different TTLs. The most
+    recently used entries are also kept in memory, so repeated lookups skip the
+    database and JSON decoding. The cache is safe to share between threads.
+    Storage errors never propagate: a broken or unwritable cache behaves like
+    an empty one.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """Open (or create) the cache database.
+
+        Args:
+            path: Database file. If None, uses ~/.spotsync/cache.db
+        """
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            self._conn = sqlite3.connect(str(path or get_cache_path()), check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses "
+                    "(key TEXT PRIMARY KEY, ts REAL NOT NULL, value TEXT NOT NULL)"
+                )
+                self._conn.execute(
+                    "DELETE FROM responses WHERE ts < ?", (time.time() - MAX_ENTRY_AGE,)
+                )
+        except (sqlite3.Error, OSError):
+            self._conn = None
+
+    def get(self, key: str, ttl: float) -> Optional[Any]:
+        """Return the cached value for key if it is younger than ttl seconds."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+        
+        if entry is None:
+            if self._conn is None:
+                return None
+            
+            try:
+                with self._lock:
+                    row = self._conn.execute(
+                        "SELECT ts, value FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+            except sqlite3.Error:
+                return None
+            
+            if row is None:
+                return None
+            entry = (row[0], json.loads(row[1]))
+            self._remember(key, entry)
+        
+        if time.time() - entry[0] > ttl:
+            return None
+        return entry[1]
+    
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key, replacing any previous entry."""
+        now = time.time()
+        self._remember(key, (now, value))
+        
+        if self._conn is None:
+            return
+        
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, ts, value) VALUES (?, ?, ?)",
+                    (key, now, json.dumps(value))
+                )
+        except sqlite3.Error:
+            pass  # Caching is best-effort
+    
+    def _remember(self, key: str, entry: Tuple[float, Any]) -> None:
+        """Add an entry to the in-memory layer, evicting the least recently used."""
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            if len(self._memory) > MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
@@ -1,25 +1,40 @@
 """Command-line interface for SpotSync."""
 
+import os
 import sys
+import asyncio
+from itertools import chain
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, List, Dict, Callable
 import typer
 from rich.console import Console
 from rich.table import Table
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.live import Live
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn
 
-from .parser import M3U8Parser
-from .matcher import TrackMatcher
-from .spotify_api import SpotifyAPI, SpotifyConfig
-from .comparer import PlaylistComparer, ComparisonResult
+from .parser import M3U8Parser, Track
+
+if TYPE_CHECKING:
+    # The Spotify stack is imported inside the commands that need it, so that
+    # --help and list-tracks start without loading spotipy and requests
+    from .spotify_api import SpotifyAPI
+    from .matcher import TrackMatcher, MatchResult
 
 
 app = typer.Typer(help="Synchronize M3U8 playlists with Spotify")
 console = Console()
 
+# Maximum number of Spotify searches in flight at once (fits SpotifyConfig.max_connections)
+SEARCH_CONCURRENCY = 20
+
+# Finished searches waiting to be matched before searching pauses
+SEARCH_QUEUE_SIZE = 64
 
-def setup_spotify() -> SpotifyAPI:
+
+def setup_spotify() -> "SpotifyAPI":
     """Setup Spotify API client."""
+    from .spotify_api import SpotifyAPI
+    
     try:
         return SpotifyAPI()
     except ValueError as e:
@@ -31,6 +46,67 @@ def setup_spotify() -> SpotifyAPI:
         sys.exit(1)
 
 
+async def _search_and_match(spotify: "SpotifyAPI", matcher: "TrackMatcher",
+                            tracks: List[Track], queries: List[str], limit: int,
+                            on_done: Callable[[], None]) -> List[Optional["MatchResult"]]:
+    """Search Spotify for every track and match the results as they arrive.
+    
+    Searches run concurrently in worker threads (a semaphore bounds the number
+    of requests in flight, so each reuses a pooled keep-alive connection and the
+    run stays within Spotify's rate limits). Finished searches are queued for a
+    consumer that matches whatever has arrived as one batch with
+    TrackMatcher.find_best_matches, whose rapidfuzz scoring releases the GIL, so
+    matching overlaps the remaining network work instead of waiting for it.
+    Queries that differ only in case or surrounding whitespace are searched once.
+    
+    Returns:
+        List of MatchResult objects (or None for unmatched tracks), in track order
+    """
+    sem = asyncio.Semaphore(SEARCH_CONCURRENCY)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SEARCH_QUEUE_SIZE)
+    matches: List[Optional["MatchResult"]] = [None] * len(tracks)
+    
+    # Search each distinct query once and fan the results out to every track using it
+    unique: Dict[str, List[int]] = {}
+    for i, query in enumerate(queries):
+        unique.setdefault(query.strip().lower(), []).append(i)
+    
+    async def search(indices: List[int]) -> None:
+        async with sem:
+            results = await asyncio.to_thread(spotify.search_track, queries[indices[0]], limit)
+        for i in indices:
+            await queue.put((i, results))
+    
+    async def produce() -> None:
+        await asyncio.gather(*(search(indices) for indices in unique.values()))
+        await queue.put(None)
+    
+    async def consume() -> None:
+        finished = False
+        while not finished:
+            # Match every search that has finished so far as one batch
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            if batch[-1] is None:
+                finished = True
+                batch.pop()
+            if not batch:
+                continue
+            
+            batch_matches = await asyncio.to_thread(
+                matcher.find_best_matches,
+                [(tracks[i].title, tracks[i].artist) for i, _ in batch],
+                [results for _, results in batch]
+            )
+            for (i, _), match in zip(batch, batch_matches):
+                matches[i] = match
+                on_done()
+    
+    await asyncio.gather(produce(), consume())
+    return matches
+
+
 @app.command()
 def sync(
     m3u8_path: Path = typer.Argument(..., help="Path to M3U8 playlist file"),
@@ -39,8 +115,11 @@ def sync(
     public: bool = typer.Option(True, "--public/--private", "-p/-P", help="Make playlist public or private"),
     clear: bool = typer.Option(False, "--clear", "-c", help="Clear existing playlist before adding tracks"),
     dry_run: bool = typer.Option(False, "--dry-run", "-d", help="Show what would be done without making changes"),
+    workers: int = typer.Option(os.cpu_count() or 1, "--workers", "-w", help="Number of threads rapidfuzz uses to score each batch of matches"),
 ):
     """Sync an M3U8 playlist file to Spotify."""
+    from .matcher import TrackMatcher
+    
     # Parse M3U8 file
     console.print(f"\n[cyan]Parsing M3U8 file:[/cyan] {m3u8_path}")
     parser = M3U8Parser()
@@ -65,30 +144,28 @@ def sync(
     if playlist_name is None:
         playlist_name = parser.playlist_name or m3u8_path.stem
     
-    # Search for tracks on Spotify
-    console.print(f"\n[cyan]Searching for tracks on Spotify...[/cyan]")
+    # Search for tracks on Spotify, matching results as they come in
+    console.print(f"\n[cyan]Searching and matching tracks with threshold {threshold}...[/cyan]")
+    matcher = TrackMatcher(threshold=threshold, workers=workers)
     
-    queries = []
-    for track in tracks:
-        if track.artist:
-            query = f"{track.artist} {track.title}"
-        else:
-            query = track.title
-        queries.append(query)
+    queries = [track.query for track in tracks]
     
     # Search with progress bar
-    search_results = []
+    matches = []
     with Progress(
         SpinnerColumn(),
         TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
         console=console,
+        refresh_per_second=5,
     ) as progress:
         if not dry_run:
             task = progress.add_task("Searching...", total=len(queries))
-            for i, query in enumerate(queries):
-                results = spotify.search_track(query, limit=5)
-                search_results.append(results)
-                progress.update(task, advance=1, description=f"Searching... ({i+1}/{len(queries)})")
+            matches = asyncio.run(
+                _search_and_match(spotify, matcher, tracks, queries, 5,
+                                  lambda: progress.advance(task))
+            )
         else:
             # In dry-run mode, just show what we would search for
             for track in tracks:
@@ -98,13 +175,6 @@ def sync(
         console.print(f"\n[yellow]Dry run mode - no changes made[/yellow]")
         return
     
-    # Match tracks
-    console.print(f"\n[cyan]Matching tracks with threshold {threshold}...[/cyan]")
-    matcher = TrackMatcher(threshold=threshold)
-    
-    local_tracks = [(track.title, track.artist) for track in tracks]
-    matches = matcher.find_best_matches(local_tracks, search_results)
-    
     # Show matching results
     matched_count = sum(1 for m in matches if m is not None)
     console.print(f"\n[green]Matched {matched_count}/{len(tracks)} tracks[/green]")
@@ -118,6 +188,7 @@ def sync(
     
     # Check if playlist exists
     playlist_id = spotify.playlist_exists(playlist_name)
+    existing = None  # Track IDs already in the playlist, when known without fetching it
     
     if playlist_id:
         console.print(f"[yellow]Playlist '{playlist_name}' already exists[/yellow]")
@@ -131,12 +202,13 @@ def sync(
             description=f"Imported from {m3u8_path.name}",
             public=public
         )
+        existing = set()
     
     # Add matched tracks
     track_ids = [match.spotify_id for match in matches if match is not None]
     console.print(f"\n[cyan]Adding {len(track_ids)} tracks to playlist...[/cyan]")
     
-    added_count = spotify.add_tracks_to_playlist(playlist_id, track_ids)
+    added_count = spotify.add_tracks_to_playlist(playlist_id, track_ids, existing=existing)
     console.print(f"[green]Successfully added {added_count} tracks[/green]")
     
     # Show summary
@@ -154,13 +226,16 @@ def list_tracks(
     """List all tracks in an M3U8 file."""
     parser = M3U8Parser()
     
+    # Read the first track before showing the table, so a missing, invalid or
+    # empty file prints only its message
+    tracks = parser.iter_parse(str(m3u8_path))
     try:
-        tracks = parser.parse(str(m3u8_path))
+        first = next(tracks, None)
     except Exception as e:
         console.print(f"[red]Error parsing M3U8 file: {e}[/red]")
         sys.exit(1)
     
-    if not tracks:
+    if first is None:
         console.print("[yellow]No tracks found in M3U8 file[/yellow]")
         return
     
@@ -171,17 +246,23 @@ def list_tracks(
     table.add_column("Title", style="green")
     table.add_column("Duration", style="yellow")
     
-    for i, track in enumerate(tracks, 1):
-        duration = f"{track.duration}s" if track.duration else "-"
-        table.add_row(
-            str(i),
-            track.artist or "-",
-            track.title,
-            duration
-        )
+    # Rows are rendered as they are parsed rather than after the whole file is read
+    count = 0
+    try:
+        with Live(table, console=console, refresh_per_second=10):
+            for count, track in enumerate(chain([first], tracks), 1):
+                duration = f"{track.duration}s" if track.duration else "-"
+                table.add_row(
+                    str(count),
+                    track.artist or "-",
+                    track.title,
+                    duration
+                )
+    except Exception as e:
+        console.print(f"[red]Error parsing M3U8 file: {e}[/red]")
+        sys.exit(1)
     
-    console.print(table)
-    console.print(f"\n[cyan]Total tracks: {len(tracks)}[/cyan]")
+    console.print(f"\n[cyan]Total tracks: {count}[/cyan]")
 
 
 @app.command()
@@ -191,6 +272,8 @@ def test_match(
     limit: int = typer.Option(10, "--limit", "-l", help="Number of tracks to test"),
 ):
     """Test track matching without creating a playlist."""
+    from .matcher import TrackMatcher
+    
     # Parse M3U8 file
     parser = M3U8Parser()
     
@@ -215,12 +298,7 @@ def test_match(
         console.print(f"[cyan]Local track:[/cyan] {track.artist or 'Unknown'} - {track.title}")
         
         # Search on Spotify
-        if track.artist:
-            query = f"{track.artist} {track.title}"
-        else:
-            query = track.title
-        
-        results = spotify.search_track(query, limit=5)
+        results = spotify.search_track(track.query, limit=5)
         
         if not results:
             console.print("  [red]No results found[/red]\n")
@@ -247,9 +325,11 @@ def compare(
     spotify_name: Optional[str] = typer.Option(None, "--spotify-name", "-s", help="Spotify playlist name (defaults to M3U8 filename)"),
     threshold: float = typer.Option(0.83, "--threshold", "-t", help="Matching confidence threshold (0-1)"),
     format: str = typer.Option("table", "--format", "-f", help="Output format: table, json, summary"),
+    workers: int = typer.Option(os.cpu_count() or 1, "--workers", "-w", help="Number of threads rapidfuzz uses to score the comparison"),
 ):
     """Compare an M3U8 playlist with a Spotify playlist to find differences."""
-    import json
+    from .matcher import TrackMatcher
+    from .comparer import PlaylistComparer
     
     # Parse M3U8 file
     console.print(f"\n[cyan]Parsing M3U8 file:[/cyan] {m3u8_path}")
@@ -295,7 +375,7 @@ def compare(
     
     # Compare playlists
     console.print(f"\n[cyan]Comparing playlists with threshold {threshold}...[/cyan]")
-    comparer = PlaylistComparer(TrackMatcher(threshold=threshold))
+    comparer = PlaylistComparer(TrackMatcher(threshold=threshold, workers=workers))
     result = comparer.compare_playlists(local_tracks, spotify_tracks)
     
     # Display results based on format
@@ -305,7 +385,7 @@ def compare(
             "summary": {
                 "local_tracks": result.total_local,
                 "spotify_tracks": result.total_spotify,
-                "matched": len(result.matched),
+                "matched": len(result.matched_local),
                 "match_percentage": round(result.match_percentage, 2)
             },
             "local_only": [
@@ -321,17 +401,18 @@ def compare(
                     "local": {"artist": local.artist or "", "title": local.title},
                     "spotify": {"artist": spotify["artists"], "title": spotify["name"]}
                 }
-                for local, spotify in result.matched
+                for local, spotify in zip(result.matched_local, result.matched_spotify)
             ]
         }
-        console.print_json(json.dumps(output, indent=2))
+        # Pass the data directly so Rich doesn't have to re-parse a dumped string
+        console.print_json(data=output, indent=2)
     
     elif format == "summary":
         # Summary output
         console.print(f"\n[bold]Comparison Summary:[/bold]")
         console.print(f"- Local tracks: {result.total_local}")
         console.print(f"- Spotify tracks: {result.total_spotify}")
-        console.print(f"- Matched: {len(result.matched)} ({result.match_percentage:.1f}%)")
+        console.print(f"- Matched: {len(result.matched_local)} ({result.match_percentage:.1f}%)")
         console.print(f"- Only in M3U8: {len(result.local_only)}")
         console.print(f"- Only in Spotify: {len(result.spotify_only)}")
     
@@ -341,7 +422,7 @@ def compare(
         console.print(f"\n[bold]📊 Summary:[/bold]")
         console.print(f"- Local tracks: {result.total_local}")
         console.print(f"- Spotify tracks: {result.total_spotify}")
-        console.print(f"- Matched: {len(result.matched)} ({result.match_percentage:.1f}%)")
+        console.print(f"- Matched: {len(result.matched_local)} ({result.match_percentage:.1f}%)")
         
         # Local only tracks
         if result.local_only:
@@ -1,20 +1,36 @@
 """Playlist comparison module for comparing M3U8 with Spotify playlists."""
 
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import List, Tuple, Set, Optional, Dict, Any
+from typing import Iterable, List, Tuple, Set, Optional, Dict, Any
+import numpy as np
 from .parser import Track
-from .matcher import TrackMatcher
+from .matcher import TrackMatcher, Candidate
 
 
-@dataclass
+# Local tracks scored per similarity matrix; bounds memory to
+# SCORE_BLOCK_ROWS x len(spotify_tracks) scores
+SCORE_BLOCK_ROWS = 256
+
+# Tolerance for floating-point rounding when comparing score bounds to the threshold
+BOUND_SLACK = 1e-9
+
+
+@dataclass(slots=True)
 class ComparisonResult:
     """Results of playlist comparison."""
     local_only: List[Track]  # Tracks only in M3U8
     spotify_only: List[Dict[str, Any]]  # Tracks only in Spotify
-    matched: List[Tuple[Track, Dict[str, Any]]]  # Matched pairs
+    matched_local: List[Track]  # Matched local tracks...
+    matched_spotify: List[Dict[str, Any]]  # ...and their Spotify tracks, in the same order
     total_local: int
     total_spotify: int
     match_percentage: float
+    
+    @property
+    def matched(self) -> List[Tuple[Track, Dict[str, Any]]]:
+        """Matched (local, Spotify) pairs."""
+        return list(zip(self.matched_local, self.matched_spotify))
 
 
 class PlaylistComparer:
@@ -31,80 +47,122 @@ class PlaylistComparer:
     def compare_playlists(
         self, 
         local_tracks: List[Track], 
-        spotify_tracks: List[Dict[str, Any]]
+        spotify_tracks: Iterable[Dict[str, Any]]
     ) -> ComparisonResult:
         """Compare local M3U8 tracks with Spotify playlist tracks.
         
         Args:
             local_tracks: List of Track objects from M3U8Parser
-            spotify_tracks: List of track dicts from Spotify API
+            spotify_tracks: Track dicts from Spotify API (any iterable, read once)
             
         Returns:
             ComparisonResult with detailed differences
         """
         # Initialize result containers
-        matched_pairs = []
+        matched_local = []
+        matched_spotify = []
         local_only = []
-        spotify_only = []
         
-        # Track which Spotify tracks have been matched
-        matched_spotify_ids = set()
+        # Spotify tracks not matched yet, by position; whatever is left at the end
+        # is spotify_only, already in playlist order
+        remaining: Dict[int, Dict[str, Any]] = {}
         
-        # Try to match each local track with a Spotify track using TrackMatcher
-        for local_track in local_tracks:
-            # Convert Spotify tracks to the format expected by TrackMatcher
-            spotify_results = []
-            for spotify_track in spotify_tracks:
-                # Skip if already matched
-                if spotify_track['id'] in matched_spotify_ids:
-                    continue
-                
-                # Convert to TrackMatcher format
-                track_result = {
-                    'id': spotify_track['id'],
-                    'name': spotify_track['name'],
-                    'artists': [{'name': artist.strip()} for artist in spotify_track['artists'].split(',')]
-                }
-                spotify_results.append(track_result)
+        # Positions of each Spotify track ID for constant-time lookup after a match
+        # (a playlist may contain the same track more than once)
+        positions: Dict[str, List[int]] = defaultdict(list)
+        
+        # Convert and clean Spotify tracks once instead of once per local track;
+        # column_of maps playlist positions to score matrix columns
+        candidates = []
+        column_of: Dict[int, int] = {}
+        
+        for idx, spotify_track in enumerate(spotify_tracks):
+            remaining[idx] = spotify_track
+            positions[spotify_track['id']].append(idx)
+            candidate = self._to_candidate(spotify_track)
+            if candidate is not None:
+                column_of[idx] = len(candidates)
+                candidates.append(candidate)
+        
+        total_spotify = len(remaining)
+        
+        # Columns that can still be matched
+        available = np.ones(len(candidates), dtype=bool)
+        
+        # Score local tracks against all Spotify tracks a block of rows at a time,
+        # then assign matches greedily in playlist order
+        for start in range(0, len(local_tracks), SCORE_BLOCK_ROWS):
+            block = local_tracks[start:start + SCORE_BLOCK_ROWS]
+            clean_titles = [self.matcher._clean_string(t.title) for t in block]
+            clean_artists = [self.matcher._clean_string(t.artist) for t in block]
             
-            # Use TrackMatcher to find the best match
-            match_result = self.matcher.match_track(
-                local_track.title, 
-                local_track.artist, 
-                spotify_results
-            )
+            # Only score local tracks that could reach the threshold against some track
+            viable = []
+            if candidates:
+                bound = self.matcher.score_upper_bound(clean_titles, clean_artists, candidates)
+                viable = np.flatnonzero(
+                    bound.max(axis=1) >= self.matcher.threshold - BOUND_SLACK
+                ).tolist()
+            scores = dict(zip(viable, self.matcher.score_matrix(
+                [clean_titles[i] for i in viable],
+                [clean_artists[i] for i in viable],
+                candidates,
+                prune=True
+            )))
             
-            if match_result:
-                # Find the original Spotify track using the matched ID
-                matched_spotify_track = None
-                for spotify_track in spotify_tracks:
-                    if spotify_track['id'] == match_result.spotify_id:
-                        matched_spotify_track = spotify_track
-                        break
+            for i, local_track in enumerate(block):
+                if i not in scores:
+                    local_only.append(local_track)
+                    continue
+                
+                # Exclude Spotify tracks matched by earlier local tracks
+                row = np.where(available, scores[i], -1.0)
                 
-                if matched_spotify_track:
-                    matched_pairs.append((local_track, matched_spotify_track))
-                    matched_spotify_ids.add(match_result.spotify_id)
-                else:
+                # First best candidate wins ties, as in TrackMatcher.match_prepared
+                best = int(row.argmax()) if len(row) else -1
+                if best < 0 or row[best] <= 0.0 or row[best] < self.matcher.threshold:
                     local_only.append(local_track)
-            else:
-                local_only.append(local_track)
+                    continue
+                
+                # Take the matched track (and any repeats of it) out of the remaining set;
+                # the first occurrence is the one reported
+                matched_spotify_track = None
+                for idx in positions[candidates[best].spotify_id]:
+                    track = remaining.pop(idx, None)
+                    if idx in column_of:
+                        available[column_of[idx]] = False
+                    if matched_spotify_track is None:
+                        matched_spotify_track = track
+                
+                matched_local.append(local_track)
+                matched_spotify.append(matched_spotify_track)
         
-        # Find Spotify tracks that weren't matched
-        for spotify_track in spotify_tracks:
-            if spotify_track['id'] not in matched_spotify_ids:
-                spotify_only.append(spotify_track)
+        # Spotify tracks that weren't matched
+        spotify_only = list(remaining.values())
         
         # Calculate match percentage
         # Count total unique tracks considering both playlists
         total_unique = len(local_tracks) + len(spotify_only)
-        match_percentage = (len(matched_pairs) / total_unique * 100) if total_unique > 0 else 0.0
+        match_percentage = (len(matched_local) / total_unique * 100) if total_unique > 0 else 0.0
         
         return ComparisonResult(
             local_only=local_only,
             spotify_only=spotify_only,
-            matched=matched_pairs,
+            matched_local=matched_local,
+            matched_spotify=matched_spotify,
             total_local=len(local_tracks),
-            total_spotify=len(spotify_tracks),
+            total_spotify=total_spotify,
             match_percentage=match_percentage
-        )
\ No newline at end of file
+        )
+    
+    def _to_candidate(self, spotify_track: Dict[str, Any]) -> Optional[Candidate]:
+        """Convert a detailed Spotify track dict straight to a TrackMatcher Candidate.
+        
+        Equivalent to prepare_candidate on the search-result format, without
+        building the intermediate artist dicts.
+        """
+        if not spotify_track['id']:
+            return None
+        
+        artist = ' '.join(name.strip() for name in spotify_track['artists'].split(','))
+        return self.matcher.make_candidate(spotify_track['id'], spotify_track['name'], artist)
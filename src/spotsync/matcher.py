@@ -1,12 +1,29 @@
 """Track matching module with fuzzy matching capabilities."""
 
 import re
-from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
+from typing import FrozenSet, List, Dict, Optional, Tuple
 from dataclasses import dataclass
-from Levenshtein import ratio
+import numpy as np
+from rapidfuzz.distance.Indel import normalized_similarity as ratio
+from rapidfuzz.process import cdist, cpdist
 
 
-@dataclass
+# Patterns used by TrackMatcher._clean_string
+_BRACKET_RE = re.compile(r'\[([^\]]*(?:remix|mix|edit|version|rework)[^\]]*)\]')
+_PAREN_RE = re.compile(r'\(([^)]*(?:remix|mix|edit|version|rework)[^)]*)\)')
+_FEAT_RE = re.compile(r'\((?:feat\.?|featuring|ft\.?)\s*([^)]+)\)')
+_FEAT_SEP_RE = re.compile(r'[,&]')
+_PAREN_STRIP_RE = re.compile(r'\([^)]*\)')
+_BRACKET_STRIP_RE = re.compile(r'\[[^\]]*\]')
+_WORD_RE = re.compile(r'\w+')
+
+# Margin kept below the score cutoffs: rapidfuzz converts a similarity cutoff
+# to a distance one with some rounding, which must never drop a viable pair
+_CUTOFF_SLACK = 1e-5
+
+
+@dataclass(slots=True, frozen=True)
 class MatchResult:
     """Result of a track matching operation."""
     spotify_id: str
@@ -17,25 +34,45 @@ class MatchResult:
     original_artist: Optional[str] = None
 
 
+@dataclass(slots=True)
+class Candidate:
+    """A Spotify track with its fields pre-cleaned for scoring."""
+    spotify_id: str
+    title: str
+    artist: str
+    clean_title: str
+    clean_artist: str
+    artist_words: FrozenSet[str] = frozenset()  # Words of clean_artist, for order-insensitive matching
+
+
 class TrackMatcher:
     """Handles fuzzy matching of tracks against Spotify search results."""
     
-    def __init__(self, threshold: float = 0.8):
+    def __init__(self, threshold: float = 0.8, workers: int = -1):
         """Initialize the matcher with a confidence threshold.
         
         Args:
             threshold: Minimum confidence score (0-1) for a match to be considered valid
+            workers: Threads used by score_matrix (-1 for all CPUs)
         """
         self.threshold = threshold
+        self.workers = workers
+        
+        # Prepared candidates by Spotify ID; popular tracks come back for many queries
+        self._candidate_cache: Dict[str, Candidate] = {}
     
     def match_track(self, local_title: str, local_artist: Optional[str], 
-                   spotify_results: List[Dict]) -> Optional[MatchResult]:
+                   spotify_results: List[Dict],
+                   clean_title: Optional[str] = None,
+                   clean_artist: Optional[str] = None) -> Optional[MatchResult]:
         """Match a local track against Spotify search results.
         
         Args:
             local_title: Title from the M3U8 file
             local_artist: Artist from the M3U8 file (if available)
             spotify_results: List of track objects from Spotify API
+            clean_title: Pre-cleaned local title, computed if omitted
+            clean_artist: Pre-cleaned local artist, computed if omitted
             
         Returns:
             MatchResult if a good match is found, None otherwise
@@ -43,45 +80,276 @@ class TrackMatcher:
         if not spotify_results:
             return None
         
+        candidates = [self.prepare_candidate(track) for track in spotify_results]
+        return self.match_prepared(local_title, local_artist, candidates, clean_title, clean_artist)
+    
+    def prepare_candidate(self, track: Dict) -> Optional[Candidate]:
+        """Extract and clean the fields of a Spotify track object used for scoring.
+        
+        Candidates are cached by track ID, so each track is cleaned only once.
+        
+        Returns:
+            Candidate, or None if the track has no ID
+        """
+        spotify_id = track.get('id')
+        if not spotify_id:
+            return None
+        
+        candidate = self._candidate_cache.get(spotify_id)
+        if candidate is None:
+            spotify_artist = ' '.join(artist['name'] for artist in track.get('artists', []))
+            candidate = self.make_candidate(spotify_id, track.get('name', ''), spotify_artist)
+            self._candidate_cache[spotify_id] = candidate
+        return candidate
+    
+    def make_candidate(self, spotify_id: str, title: str, artist: str) -> Candidate:
+        """Build a Candidate from a track's ID, title and space-joined artist names."""
+        clean_artist = self._clean_string(artist)
+        return Candidate(
+            spotify_id=spotify_id,
+            title=title,
+            artist=artist,
+            clean_title=self._clean_string(title),
+            clean_artist=clean_artist,
+            artist_words=frozenset(clean_artist.split())
+        )
+    
+    def match_prepared(self, local_title: str, local_artist: Optional[str],
+                       candidates: List[Optional[Candidate]],
+                       clean_title: Optional[str] = None,
+                       clean_artist: Optional[str] = None) -> Optional[MatchResult]:
+        """Match a local track against candidates from prepare_candidate.
+        
+        Lets callers that score the same tracks repeatedly clean them only once.
+        
+        Args:
+            local_title: Title from the M3U8 file
+            local_artist: Artist from the M3U8 file (if available)
+            candidates: Prepared Spotify candidates (None entries are skipped)
+            clean_title: Pre-cleaned local title, computed if omitted
+            clean_artist: Pre-cleaned local artist, computed if omitted
+            
+        Returns:
+            MatchResult if a good match is found, None otherwise
+        """
+        best, score = self.best_candidate(local_title, local_artist, candidates,
+                                          clean_title, clean_artist)
+        
+        # Return match only if it meets the threshold
+        if best is not None and score >= self.threshold:
+            return MatchResult(
+                spotify_id=best.spotify_id,
+                confidence=score,
+                matched_title=best.title,
+                matched_artist=best.artist,
+                original_title=local_title,
+                original_artist=local_artist
+            )
+        
+        return None
+    
+    def best_candidate(self, local_title: str, local_artist: Optional[str],
+                       candidates: List[Optional[Candidate]],
+                       clean_title: Optional[str] = None,
+                       clean_artist: Optional[str] = None) -> Tuple[Optional[Candidate], float]:
+        """Find the highest-scoring candidate, whether or not it meets the threshold.
+        
+        Args:
+            local_title: Title from the M3U8 file
+            local_artist: Artist from the M3U8 file (if available)
+            candidates: Prepared Spotify candidates (None entries are skipped)
+            clean_title: Pre-cleaned local title, computed if omitted
+            clean_artist: Pre-cleaned local artist, computed if omitted
+            
+        Returns:
+            Tuple of (candidate, score); (None, 0.0) if nothing scores above zero.
+            Ties go to the earlier candidate.
+        """
         best_match = None
         best_score = 0.0
         
         # Clean the local track info
-        clean_title = self._clean_string(local_title)
-        clean_artist = self._clean_string(local_artist) if local_artist else ""
-        
-        for track in spotify_results:
-            # Extract Spotify track info
-            spotify_title = track.get('name', '')
-            spotify_artists = [artist['name'] for artist in track.get('artists', [])]
-            spotify_artist = ' '.join(spotify_artists)
-            spotify_id = track.get('id')
-            
-            if not spotify_id:
+        if clean_title is None:
+            clean_title = self._clean_string(local_title)
+        if clean_artist is None:
+            clean_artist = self._clean_string(local_artist) if local_artist else ""
+        local_words = frozenset(clean_artist.split())
+        
+        for candidate in candidates:
+            if candidate is None:
                 continue
             
             # Calculate match score
-            score = self._calculate_match_score(
+            # Candidates that can't beat the best so far skip the artist comparison
+            score = self._score_cleaned(
                 clean_title, clean_artist,
-                spotify_title, spotify_artist
+                candidate.clean_title, candidate.clean_artist,
+                local_words, candidate.artist_words,
+                beat=best_score
             )
             
             if score > best_score:
                 best_score = score
-                best_match = MatchResult(
-                    spotify_id=spotify_id,
-                    confidence=score,
-                    matched_title=spotify_title,
-                    matched_artist=spotify_artist,
-                    original_title=local_title,
-                    original_artist=local_artist
-                )
+                best_match = candidate
         
-        # Return match only if it meets the threshold
-        if best_match and best_match.confidence >= self.threshold:
-            return best_match
+        return best_match, best_score
+    
+    def score_matrix(self, clean_titles: List[str], clean_artists: List[str],
+                     candidates: List[Candidate], prune: bool = False) -> np.ndarray:
+        """Score every cleaned local track against every candidate at once.
         
-        return None
+        Computes exactly the scores _score_cleaned would, but the string
+        similarities are computed in C by rapidfuzz and the bonuses and weighting
+        are applied with NumPy instead of once per pair in Python.
+        
+        Args:
+            clean_titles: Cleaned local titles
+            clean_artists: Cleaned local artists ("" when unknown)
+            candidates: Prepared Spotify candidates
+            prune: Let rapidfuzz give up early on pairs that can't reach the
+                threshold (see score_cutoffs). Scores at or above the threshold
+                are unchanged; those below it may be lowered.
+            
+        Returns:
+            Array of shape (len(clean_titles), len(candidates)) with scores 0-1
+        """
+        if not clean_titles or not candidates:
+            return np.zeros((len(clean_titles), len(candidates)))
+        
+        spotify_titles = [c.clean_title for c in candidates]
+        spotify_artists = [c.clean_artist for c in candidates]
+        title_cutoff, artist_cutoff = self.score_cutoffs() if prune else (None, None)
+        
+        # Calculate title and artist similarity for all pairs
+        title_score = cdist(clean_titles, spotify_titles, scorer=ratio, dtype=np.float64,
+                            workers=self.workers, score_cutoff=title_cutoff)
+        artist_score = cdist(clean_artists, spotify_artists, scorer=ratio, dtype=np.float64,
+                             workers=self.workers, score_cutoff=artist_cutoff)
+        
+        return self._combine_scores(
+            title_score, artist_score,
+            np.array(clean_titles)[:, None], np.array(clean_artists)[:, None],
+            np.array(spotify_titles)[None, :], np.array(spotify_artists)[None, :]
+        )
+    
+    def score_pairs(self, clean_titles: List[str], clean_artists: List[str],
+                    candidates: List[Candidate], prune: bool = False) -> np.ndarray:
+        """Score the i-th cleaned local track against the i-th candidate.
+        
+        Element-wise counterpart of score_matrix, for batches where each local
+        track has its own candidates (e.g. its search results).
+        
+        Returns:
+            Array of shape (len(candidates),) with scores 0-1
+        """
+        if not candidates:
+            return np.zeros(0)
+        
+        spotify_titles = [c.clean_title for c in candidates]
+        spotify_artists = [c.clean_artist for c in candidates]
+        title_cutoff, artist_cutoff = self.score_cutoffs() if prune else (None, None)
+        
+        title_score = cpdist(clean_titles, spotify_titles, scorer=ratio, dtype=np.float64,
+                             workers=self.workers, score_cutoff=title_cutoff)
+        artist_score = cpdist(clean_artists, spotify_artists, scorer=ratio, dtype=np.float64,
+                              workers=self.workers, score_cutoff=artist_cutoff)
+        
+        return self._combine_scores(
+            title_score, artist_score,
+            np.array(clean_titles), np.array(clean_artists),
+            np.array(spotify_titles), np.array(spotify_artists)
+        )
+    
+    @staticmethod
+    def _combine_scores(title_score: np.ndarray, artist_score: np.ndarray,
+                        local_titles: np.ndarray, local_artists: np.ndarray,
+                        spotify_titles: np.ndarray, spotify_artists: np.ndarray) -> np.ndarray:
+        """Apply _score_cleaned's bonuses and weighting to the similarity scores.
+        
+        The string arrays hold cleaned titles and artists, shaped to broadcast
+        against the score arrays.
+        """
+        def per_string(func, strings: np.ndarray) -> np.ndarray:
+            return np.array([func(x) for x in strings.flat]).reshape(strings.shape)
+        
+        has_artist = (local_artists != '') & (spotify_artists != '')
+        
+        # Local artist contained in Spotify artists (for features)
+        contained = np.strings.find(per_string(str.lower, spotify_artists),
+                                    per_string(str.lower, local_artists)) >= 0
+        artist_score = np.where(contained, np.maximum(artist_score, 0.9), artist_score)
+        
+        # Same artists in different order, compared via ids of their word sets
+        word_set_ids: Dict[frozenset, int] = {}
+        set_id = lambda a: word_set_ids.setdefault(frozenset(a.split()), len(word_set_ids))
+        multi_word = per_string(lambda a: len(set(a.split())) > 1, local_artists)
+        same_artists = (per_string(set_id, local_artists) == per_string(set_id, spotify_artists)) & multi_word
+        artist_score = np.where(same_artists, np.maximum(artist_score, 0.95), artist_score)
+        
+        # Same weighting as _score_cleaned, falling back to the title score alone
+        total_score = np.where(
+            artist_score < 0.6,
+            (title_score * 0.4) + (artist_score * 0.6),
+            (title_score * 0.6) + (artist_score * 0.4)
+        )
+        total_score = np.where(has_artist, total_score, title_score)
+        
+        # Bonus for exact matches (after cleaning)
+        exact_title = local_titles == spotify_titles
+        return np.where(exact_title, np.minimum(1.0, total_score + 0.1), total_score)
+    
+    def score_cutoffs(self) -> Tuple[float, float]:
+        """Lowest title and artist similarities that can still reach the threshold.
+        
+        A non-exact title below (threshold - 0.4) / 0.6 can't reach the threshold
+        even with a perfect artist, nor below the threshold itself when there is
+        no artist. An artist below the returned cutoff can't reach it even with
+        an exact title, unless a containment or word-set bonus applies, and those
+        raise the artist score regardless of the similarity. Zeroing similarities
+        under these cutoffs therefore only lowers scores that were already below
+        the threshold, so the accepted matches and their confidences don't change.
+        
+        Returns:
+            (title_cutoff, artist_cutoff), each in 0-1
+        """
+        threshold = self.threshold
+        title_cutoff = min(threshold, (threshold - 0.4) / 0.6)
+        
+        # With an exact title (+0.1 bonus), in either weighting branch
+        artist_cutoff = min((threshold - 0.5) / 0.6, max(0.6, (threshold - 0.7) / 0.4))
+        
+        return (
+            min(1.0, max(0.0, title_cutoff - _CUTOFF_SLACK)),
+            min(1.0, max(0.0, artist_cutoff - _CUTOFF_SLACK))
+        )
+    
+    def score_upper_bound(self, clean_titles: List[str], clean_artists: List[str],
+                          candidates: List[Candidate]) -> np.ndarray:
+        """Bound score_matrix from string lengths alone, without comparing strings.
+        
+        Indel similarity can't exceed 2 * min(len) / (len + len), so a title
+        whose length is far from a candidate's can't reach a high score whatever
+        the artist score. Pairs whose bound is below the threshold can be skipped.
+        
+        Returns:
+            Array of shape (len(clean_titles), len(candidates)) that is >= score_matrix
+        """
+        local_lengths = np.array([len(t) for t in clean_titles])[:, None]
+        candidate_lengths = np.array([len(c.clean_title) for c in candidates])[None, :]
+        
+        total_length = local_lengths + candidate_lengths
+        title_bound = np.where(
+            total_length > 0,
+            2 * np.minimum(local_lengths, candidate_lengths) / np.maximum(total_length, 1),
+            1.0
+        )
+        
+        # Best case is a perfect artist score; an exact title already bounds to 1.0
+        has_artist = (
+            np.array([bool(a) for a in clean_artists])[:, None]
+            & np.array([bool(c.clean_artist) for c in candidates])[None, :]
+        )
+        return np.where(has_artist, np.minimum(1.0, title_bound * 0.6 + 0.4), title_bound)
     
     def _calculate_match_score(self, local_title: str, local_artist: str,
                               spotify_title: str, spotify_artist: str) -> float:
@@ -89,24 +357,48 @@ class TrackMatcher:
         
         Returns a score between 0 and 1, where 1 is a perfect match.
         """
-        # Clean Spotify strings
-        clean_spotify_title = self._clean_string(spotify_title)
-        clean_spotify_artist = self._clean_string(spotify_artist)
+        return self._score_cleaned(
+            local_title, local_artist,
+            self._clean_string(spotify_title),
+            self._clean_string(spotify_artist)
+        )
+    
+    def _score_cleaned(self, local_title: str, local_artist: str,
+                       clean_spotify_title: str, clean_spotify_artist: str,
+                       local_words: Optional[FrozenSet[str]] = None,
+                       spotify_words: Optional[FrozenSet[str]] = None,
+                       beat: Optional[float] = None) -> float:
+        """Calculate similarity score when both sides are already cleaned.
         
-        # Calculate title similarity
-        title_score = ratio(local_title, clean_spotify_title)
+        The artists' word sets are computed if not passed in. If beat is given
+        and the title score alone shows the total can't exceed it, the artists
+        aren't compared and an upper bound (no greater than beat) is returned.
+        """
+        # Calculate title similarity (identical strings, common with clean metadata,
+        # skip the edit-distance computation)
+        exact_title = local_title == clean_spotify_title
+        title_score = 1.0 if exact_title else ratio(local_title, clean_spotify_title)
         
         # If we have artist info, use it to improve matching
         if local_artist and clean_spotify_artist:
-            artist_score = ratio(local_artist, clean_spotify_artist)
+            # Even a perfect artist score can't lift a poor title past beat
+            if beat is not None and not exact_title and title_score * 0.6 + 0.4 <= beat:
+                return title_score * 0.6 + 0.4
+            
+            if local_artist == clean_spotify_artist:
+                artist_score = 1.0
+            else:
+                artist_score = ratio(local_artist, clean_spotify_artist)
             
             # Check if local artist is contained in Spotify artists (for features)
             if local_artist.lower() in clean_spotify_artist.lower():
                 artist_score = max(artist_score, 0.9)
             
             # Check if artists are the same but in different order
-            local_words = set(local_artist.split())
-            spotify_words = set(clean_spotify_artist.split())
+            if local_words is None:
+                local_words = frozenset(local_artist.split())
+            if spotify_words is None:
+                spotify_words = frozenset(clean_spotify_artist.split())
             if local_words == spotify_words and len(local_words) > 1:
                 artist_score = max(artist_score, 0.95)  # High score for same artists in different order
             
@@ -121,14 +413,19 @@ class TrackMatcher:
             total_score = title_score
         
         # Bonus for exact matches (after cleaning)
-        if local_title == clean_spotify_title:
+        if exact_title:
             total_score = min(1.0, total_score + 0.1)
         
         return total_score
     
-    def _clean_string(self, text: Optional[str]) -> str:
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _clean_string(text: Optional[str]) -> str:
         """Clean and normalize a string for matching.
         
+        Results are memoized, as the same artists and titles recur across
+        playlists and search results.
+        
         - Converts to lowercase
         - Extracts and preserves important content from parentheses/brackets
         - Removes special characters
@@ -140,41 +437,48 @@ class TrackMatcher:
         # Convert to lowercase
         text = text.lower()
         
+        # Parentheses and brackets need extra passes; most titles have neither
+        if '(' in text or '[' in text:
+            text = TrackMatcher._strip_brackets(text)
+        
+        # Drop special characters and normalize whitespace in one scan:
+        # what remains is the runs of word characters
+        return ' '.join(_WORD_RE.findall(text))
+    
+    @staticmethod
+    def _strip_brackets(text: str) -> str:
+        """Remove parenthesized/bracketed content, keeping remix and feature info."""
         # Extract important content from parentheses and brackets before removing them
         # Look for remix information, features, etc.
         important_content = []
         
         # Extract remix info from brackets [...]
-        bracket_matches = re.findall(r'\[([^\]]*(?:remix|mix|edit|version|rework)[^\]]*)\]', text)
+        bracket_matches = _BRACKET_RE.findall(text)
         important_content.extend(bracket_matches)
         
         # Extract remix info from parentheses (...)  
-        paren_matches = re.findall(r'\(([^)]*(?:remix|mix|edit|version|rework)[^)]*)\)', text)
+        paren_matches = _PAREN_RE.findall(text)
         important_content.extend(paren_matches)
         
         # Extract featuring info but keep it simpler
-        feat_matches = re.findall(r'\((?:feat\.?|featuring|ft\.?)\s*([^)]+)\)', text)
+        feat_matches = _FEAT_RE.findall(text)
         # Only add featuring info if it's not already in the main text
+        # (text is already lowercase)
         for feat in feat_matches:
             # Check if the featured artist is already mentioned in the text
-            if not any(name.strip().lower() in text.lower() for name in feat.split('&') + feat.split(',') if name.strip()):
+            names = [name.strip() for name in _FEAT_SEP_RE.split(feat)]
+            if not any(name in text for name in names if name):
                 important_content.append(feat)
         
         # Remove ALL content in parentheses and brackets now
-        text = re.sub(r'\([^)]*\)', '', text)
-        text = re.sub(r'\[[^\]]*\]', '', text)
+        text = _PAREN_STRIP_RE.sub('', text)
+        text = _BRACKET_STRIP_RE.sub('', text)
         
         # Add back the important content
         if important_content:
             text += ' ' + ' '.join(important_content)
         
-        # Remove special characters but keep spaces
-        text = re.sub(r'[^\w\s]', ' ', text)
-        
-        # Normalize whitespace
-        text = ' '.join(text.split())
-        
-        return text.strip()
+        return text
     
     def find_best_matches(self, local_tracks: List[Tuple[str, Optional[str]]], 
                          spotify_results_list: List[List[Dict]]) -> List[Optional[MatchResult]]:
@@ -190,9 +494,48 @@ class TrackMatcher:
         if len(local_tracks) != len(spotify_results_list):
             raise ValueError("Number of local tracks must match number of result lists")
         
-        matches = []
-        for (title, artist), results in zip(local_tracks, spotify_results_list):
-            match = self.match_track(title, artist, results)
-            matches.append(match)
+        # Flatten every (local track, result) pair so all of them are scored in one batch
+        owners = []
+        candidates = []
+        for i, results in enumerate(spotify_results_list):
+            for track in results:
+                candidate = self.prepare_candidate(track)
+                if candidate is not None:
+                    owners.append(i)
+                    candidates.append(candidate)
+        
+        clean_titles = [self._clean_string(title) for title, _ in local_tracks]
+        clean_artists = [self._clean_string(artist) if artist else "" for _, artist in local_tracks]
+        scores = self.score_pairs(
+            [clean_titles[i] for i in owners],
+            [clean_artists[i] for i in owners],
+            candidates,
+            prune=True
+        )
+        
+        matches: List[Optional[MatchResult]] = [None] * len(local_tracks)
+        if not candidates:
+            return matches
+        
+        # Best result per track: sort by track, then score descending, then position,
+        # so the first entry of each track's run is the first best result
+        # (ties resolve as in match_prepared)
+        owners_array = np.array(owners)
+        order = np.lexsort((np.arange(len(owners)), -scores, owners_array))
+        firsts = order[np.unique(owners_array[order], return_index=True)[1]]
+        accepted = firsts[(scores[firsts] > 0.0) & (scores[firsts] >= self.threshold)]
+        
+        for best in accepted.tolist():
+            i = owners[best]
+            title, artist = local_tracks[i]
+            candidate = candidates[best]
+            matches[i] = MatchResult(
+                spotify_id=candidate.spotify_id,
+                confidence=float(scores[best]),
+                matched_title=candidate.title,
+                matched_artist=candidate.artist,
+                original_title=title,
+                original_artist=artist
+            )
         
-        return matches
\ No newline at end of file
+        return matches
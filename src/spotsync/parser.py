@@ -2,17 +2,25 @@
 
 import re
 from pathlib import Path
-from typing import List, Dict, Optional
-from dataclasses import dataclass
+from typing import Iterator, List, Dict, Optional
+from dataclasses import dataclass, field
 
 
-@dataclass
+# Leading track number in file names, e.g. "01. " or "3 - "
+_TRACKNUM_RE = re.compile(r'^\d+[\.\-\s]+')
+
+
+@dataclass(slots=True)
 class Track:
     """Represents a track with metadata."""
     title: str
     artist: Optional[str] = None
     duration: Optional[int] = None
     file_path: Optional[str] = None
+    query: str = field(init=False, repr=False, compare=False)  # Spotify search query
+    
+    def __post_init__(self):
+        self.query = f"{self.artist} {self.title}" if self.artist else self.title
 
 
 class M3U8Parser:
@@ -31,6 +39,25 @@ class M3U8Parser:
         Returns:
             List of Track objects
             
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            ValueError: If the file is not a valid M3U8
+        """
+        self.tracks = list(self.iter_parse(file_path))
+        return self.tracks
+    
+    def iter_parse(self, file_path: str) -> Iterator[Track]:
+        """Parse an M3U8 playlist file, yielding tracks as they are read.
+        
+        The file is read line by line, so tracks are available before the whole
+        playlist has been parsed. Errors are raised on the first iteration.
+        
+        Args:
+            file_path: Path to the M3U8 file
+            
+        Yields:
+            Track objects in playlist order
+            
         Raises:
             FileNotFoundError: If the file doesn't exist
             ValueError: If the file is not a valid M3U8
@@ -42,43 +69,33 @@ class M3U8Parser:
         if path.suffix.lower() not in ['.m3u', '.m3u8']:
             raise ValueError(f"File must be .m3u or .m3u8, got: {path.suffix}")
         
-        self.tracks.clear()
         self.playlist_name = path.stem
         
         with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-            lines = f.readlines()
-        
-        if not lines or not lines[0].strip().startswith('#EXTM3U'):
-            raise ValueError("Invalid M3U8 file: must start with #EXTM3U")
-        
-        i = 1
-        while i < len(lines):
-            line = lines[i].strip()
+            if not f.readline().strip().startswith('#EXTM3U'):
+                raise ValueError("Invalid M3U8 file: must start with #EXTM3U")
+            
+            # Track from an EXTINF line, waiting for its file path on the next line
+            pending: Optional[Track] = None
             
-            if line.startswith('#EXTINF:'):
-                # Parse extended info
-                track = self._parse_extinf(line)
+            for line in f:
+                line = line.strip()
                 
-                # Next line should be the file path
-                if i + 1 < len(lines):
-                    file_line = lines[i + 1].strip()
-                    if file_line and not file_line.startswith('#'):
-                        track.file_path = file_line
-                        self.tracks.append(track)
-                        i += 2
+                if pending is not None:
+                    track, pending = pending, None
+                    if line and not line.startswith('#'):
+                        track.file_path = line
+                        yield track
                         continue
                 
-                i += 1
-            elif line and not line.startswith('#'):
-                # Plain file path without EXTINF
-                track = self._parse_filename(line)
-                track.file_path = line
-                self.tracks.append(track)
-                i += 1
-            else:
-                i += 1
-        
-        return self.tracks
+                if line.startswith('#EXTINF:'):
+                    # Parse extended info
+                    pending = self._parse_extinf(line)
+                elif line and not line.startswith('#'):
+                    # Plain file path without EXTINF
+                    track = self._parse_filename(line)
+                    track.file_path = line
+                    yield track
     
     def _parse_extinf(self, line: str) -> Track:
         """Parse an EXTINF line to extract track info.
@@ -104,10 +121,10 @@ class M3U8Parser:
         artist = None
         title = track_info
         
-        if ' - ' in track_info:
-            artist_title = track_info.split(' - ', 1)
-            artist = artist_title[0].strip()
-            title = artist_title[1].strip()
+        before, sep, after = track_info.partition(' - ')
+        if sep:
+            artist = before.strip()
+            title = after.strip()
         
         return Track(title=title, artist=artist, duration=duration)
     
@@ -122,16 +139,17 @@ class M3U8Parser:
         # Remove path and extension
         name = Path(filename).stem
         
-        # Remove track numbers at the beginning
-        name = re.sub(r'^\d+[\.\-\s]+', '', name)
+        # Remove track numbers at the beginning (only possible if it starts with a digit)
+        if name[:1].isdecimal():
+            name = _TRACKNUM_RE.sub('', name)
         
         # Try to parse "Artist - Title" format
         artist = None
         title = name
         
-        if ' - ' in name:
-            parts = name.split(' - ', 1)
-            artist = parts[0].strip()
-            title = parts[1].strip()
+        before, sep, after = name.partition(' - ')
+        if sep:
+            artist = before.strip()
+            title = after.strip()
         
         return Track(title=title, artist=artist)
\ No newline at end of file
@@ -1,12 +1,37 @@
 """Spotify API integration module."""
 
 import os
-from typing import List, Dict, Optional, Set, Any
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Set, Tuple, Any
 from dataclasses import dataclass
+import requests
 import spotipy
+from requests.adapters import HTTPAdapter
 from spotipy.oauth2 import SpotifyOAuth
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
+from .cache import ResponseCache
+
+
+logger = logging.getLogger(__name__)
+
+# How long cached responses stay valid (seconds)
+SEARCH_CACHE_TTL = 7 * 24 * 3600  # Catalog search results change slowly
+PLAYLIST_CACHE_TTL = 24 * 3600  # Keyed by snapshot_id, so only metadata can drift
+PLAYLIST_INDEX_TTL = 60  # Playlists can be created or renamed from other clients
+
+# Only the fields get_playlist_tracks_detailed and get_playlist_tracks read, so
+# Spotify omits the rest (markets, images, external URLs, ...) from each page
+PLAYLIST_TRACK_FIELDS = 'items(track(id,name,artists(name),album(name),duration_ms)),total'
+PLAYLIST_TRACK_ID_FIELDS = 'items(track(id)),total'
+
+# Largest page the playlist items endpoint returns, and how many pages to fetch at once
+PLAYLIST_PAGE_SIZE = 100
+PLAYLIST_PAGE_WORKERS = 8
+
 
 @dataclass
 class SpotifyConfig:
@@ -15,16 +40,44 @@ class SpotifyConfig:
     client_secret: str
     redirect_uri: str = "http://127.0.0.1:8888/callback"
     scope: str = "playlist-read-private playlist-read-collaborative playlist-modify-public playlist-modify-private"
+    max_connections: int = 20  # Keep-alive connections available to concurrent requests
+
+
+def _build_session(pool_size: int) -> requests.Session:
+    """Build an HTTP session whose connection pool fits concurrent requests.
+    
+    spotipy's default session keeps only 10 connections alive, so extra
+    concurrent searches open (and then discard) fresh TLS connections. This
+    session uses the same retry policy as spotipy but a larger pool.
+    """
+    retry = Retry(
+        total=3,
+        connect=None,
+        read=False,
+        allowed_methods=frozenset(['GET', 'POST', 'PUT', 'DELETE']),
+        status=3,
+        backoff_factor=0.3,
+        status_forcelist=spotipy.Spotify.default_retry_codes
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
 
 class SpotifyAPI:
     """Handles all Spotify API interactions."""
     
-    def __init__(self, config: Optional[SpotifyConfig] = None):
+    def __init__(self, config: Optional[SpotifyConfig] = None,
+                 cache: Optional[ResponseCache] = None):
         """Initialize Spotify API client.
         
         Args:
             config: SpotifyConfig object. If None, reads from environment variables.
+            cache: Response cache for searches and playlist fetches. If None, uses
+                the default on-disk cache in ~/.spotsync
         """
         # Load environment variables from .env file if it exists
         load_dotenv()
@@ -40,13 +93,22 @@ class SpotifyAPI:
             raise ValueError("Spotify client ID and secret must be provided")
         
         self.config = config
-        self.sp = spotipy.Spotify(auth_manager=SpotifyOAuth(
-            client_id=config.client_id,
-            client_secret=config.client_secret,
-            redirect_uri=config.redirect_uri,
-            scope=config.scope
-        ))
+        
+        # One pooled session for API calls and token refreshes alike
+        self._session = _build_session(config.max_connections)
+        self.sp = spotipy.Spotify(
+            auth_manager=SpotifyOAuth(
+                client_id=config.client_id,
+                client_secret=config.client_secret,
+                redirect_uri=config.redirect_uri,
+                scope=config.scope,
+                requests_session=self._session
+            ),
+            requests_session=self._session
+        )
+        self.cache = cache if cache is not None else ResponseCache()
         self._user_id = None
+        self._playlist_name_index: Optional[Tuple[float, Dict[str, str]]] = None  # (built at, name -> ID), see playlist_exists
     
     @property
     def user_id(self) -> str:
@@ -65,28 +127,40 @@ class SpotifyAPI:
         Returns:
             List of track objects from Spotify API
         """
+        cache_key = f"search:{limit}:{query}"
+        cached = self.cache.get(cache_key, SEARCH_CACHE_TTL)
+        if cached is not None:
+            return cached
+        
         try:
             results = self.sp.search(q=query, type='track', limit=limit)
-            return results['tracks']['items']
+            tracks = results['tracks']['items']
         except Exception as e:
-            print(f"Error searching for track '{query}': {e}")
+            logger.warning("Error searching for track '%s': %s", query, e)
             return []
+        
+        # Empty results aren't kept, so a query that found nothing is retried next run
+        if tracks:
+            self.cache.set(cache_key, tracks)
+        return tracks
     
-    def search_tracks_batch(self, queries: List[str], limit: int = 10) -> List[List[Dict]]:
-        """Search for multiple tracks in sequence.
+    def search_tracks_batch(self, queries: List[str], limit: int = 10,
+                            max_workers: int = 8) -> List[List[Dict]]:
+        """Search for multiple tracks concurrently.
+        
+        Searches share the pooled session, whose retry policy waits out 429
+        responses, so no extra rate limiting is needed here.
         
         Args:
             queries: List of search queries
             limit: Maximum number of results per query
+            max_workers: Maximum number of searches in flight
             
         Returns:
-            List of result lists for each query
+            List of result lists for each query, in the same order
         """
-        results = []
-        for query in queries:
-            tracks = self.search_track(query, limit)
-            results.append(tracks)
-        return results
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda query: self.search_track(query, limit), queries))
     
     def get_user_playlists(self, limit: int = 50) -> List[Dict]:
         """Get the current user's playlists.
@@ -120,11 +194,26 @@ class SpotifyAPI:
         Returns:
             Playlist ID if found, None otherwise
         """
-        playlists = self.get_user_playlists()
-        for playlist in playlists:
-            if playlist['name'] == name:
-                return playlist['id']
-        return None
+        # Lookups reuse an index of the user's playlists until it expires. A miss
+        # on an older index rebuilds it, since the playlist may have been created
+        # or renamed elsewhere since.
+        built_at = self._playlist_name_index[0] if self._playlist_name_index else None
+        rebuilt = built_at is None or time.monotonic() - built_at > PLAYLIST_INDEX_TTL
+        if rebuilt:
+            self._build_playlist_name_index()
+        
+        playlist_id = self._playlist_name_index[1].get(name)
+        if playlist_id is None and not rebuilt:
+            self._build_playlist_name_index()
+            playlist_id = self._playlist_name_index[1].get(name)
+        return playlist_id
+    
+    def _build_playlist_name_index(self) -> None:
+        """Fetch the user's playlists and index their IDs by name."""
+        index: Dict[str, str] = {}
+        for playlist in self.get_user_playlists():
+            index.setdefault(playlist['name'], playlist['id'])  # First match wins
+        self._playlist_name_index = (time.monotonic(), index)
     
     def create_playlist(self, name: str, description: str = "", public: bool = True) -> str:
         """Create a new playlist.
@@ -143,6 +232,7 @@ class SpotifyAPI:
             public=public,
             description=description
         )
+        self._playlist_name_index = None
         return playlist['id']
     
     def get_playlist_tracks(self, playlist_id: str) -> Set[str]:
@@ -155,22 +245,37 @@ class SpotifyAPI:
             Set of track IDs
         """
         tracks = set()
-        offset = 0
-        
-        while True:
-            results = self.sp.playlist_tracks(playlist_id, offset=offset)
-            
-            for item in results['items']:
-                if item['track'] and item['track']['id']:
-                    tracks.add(item['track']['id'])
-            
-            if not results['next']:
-                break
-            
-            offset += 100
+        for item in self._playlist_items(playlist_id, PLAYLIST_TRACK_ID_FIELDS):
+            if item['track'] and item['track']['id']:
+                tracks.add(item['track']['id'])
         
         return tracks
     
+    def _playlist_items(self, playlist_id: str, fields: str) -> Iterator[Dict]:
+        """Fetch every item of a playlist, in order.
+        
+        The first page gives the total; the remaining pages are then fetched
+        concurrently rather than one after the other.
+        
+        Args:
+            playlist_id: Spotify playlist ID
+            fields: Spotify fields filter; must include 'total'
+        """
+        def page(offset: int) -> Dict:
+            return self.sp.playlist_tracks(
+                playlist_id, fields=fields, limit=PLAYLIST_PAGE_SIZE, offset=offset,
+                additional_types=('track',)
+            )
+        
+        first = page(0)
+        yield from first['items']
+        
+        offsets = range(PLAYLIST_PAGE_SIZE, first['total'], PLAYLIST_PAGE_SIZE)
+        if offsets:
+            with ThreadPoolExecutor(max_workers=PLAYLIST_PAGE_WORKERS) as executor:
+                for results in executor.map(page, offsets):
+                    yield from results['items']
+    
     def get_playlist_tracks_detailed(self, playlist_id: str) -> List[Dict[str, Any]]:
         """Get detailed track information from a Spotify playlist.
         
@@ -180,29 +285,27 @@ class SpotifyAPI:
         Returns:
             List of dicts with keys: 'id', 'name', 'artists', 'album', 'duration_ms'
         """
-        tracks = []
-        offset = 0
+        # The snapshot ID changes whenever the playlist's contents change
+        snapshot_id = self.sp.playlist(playlist_id, fields='snapshot_id')['snapshot_id']
+        cache_key = f"playlist:{playlist_id}:{snapshot_id}"
+        cached = self.cache.get(cache_key, PLAYLIST_CACHE_TTL)
+        if cached is not None:
+            return cached
         
-        while True:
-            results = self.sp.playlist_tracks(playlist_id, offset=offset)
-            
-            for item in results['items']:
-                track = item['track']
-                if track and track['id']:
-                    track_info = {
-                        'id': track['id'],
-                        'name': track['name'],
-                        'artists': ', '.join(artist['name'] for artist in track['artists']),
-                        'album': track['album']['name'],
-                        'duration_ms': track['duration_ms']
-                    }
-                    tracks.append(track_info)
-            
-            if not results['next']:
-                break
-            
-            offset += 100
+        tracks = []
+        for item in self._playlist_items(playlist_id, PLAYLIST_TRACK_FIELDS):
+            track = item['track']
+            if track and track['id']:
+                track_info = {
+                    'id': track['id'],
+                    'name': track['name'],
+                    'artists': ', '.join(artist['name'] for artist in track['artists']),
+                    'album': track['album']['name'],
+                    'duration_ms': track['duration_ms']
+                }
+                tracks.append(track_info)
         
+        self.cache.set(cache_key, tracks)
         return tracks
     
     def find_playlist_by_name(self, name: str) -> Optional[str]:
@@ -218,13 +321,17 @@ class SpotifyAPI:
         return self.playlist_exists(name)
     
     def add_tracks_to_playlist(self, playlist_id: str, track_ids: List[str], 
-                              check_duplicates: bool = True) -> int:
+                              check_duplicates: bool = True,
+                              existing: Optional[Set[str]] = None) -> int:
         """Add tracks to a playlist.
         
         Args:
             playlist_id: Spotify playlist ID
             track_ids: List of Spotify track IDs to add
             check_duplicates: Whether to check for duplicates before adding
+            existing: Track IDs already in the playlist, if known. Used instead of
+                fetching the playlist, and updated with the tracks added, so
+                callers adding in several calls fetch the playlist only once.
             
         Returns:
             Number of tracks actually added
@@ -234,8 +341,9 @@ class SpotifyAPI:
         
         # Filter out duplicates if requested
         if check_duplicates:
-            existing_tracks = self.get_playlist_tracks(playlist_id)
-            track_ids = [tid for tid in track_ids if tid not in existing_tracks]
+            if existing is None:
+                existing = self.get_playlist_tracks(playlist_id)
+            track_ids = [tid for tid in track_ids if tid not in existing]
         
         if not track_ids:
             return 0
@@ -247,8 +355,10 @@ class SpotifyAPI:
             try:
                 self.sp.playlist_add_items(playlist_id, batch)
                 added_count += len(batch)
+                if existing is not None:
+                    existing.update(batch)
             except Exception as e:
-                print(f"Error adding tracks to playlist: {e}")
+                logger.warning("Error adding tracks to playlist: %s", e)
                 break
         
         return added_count
@@ -273,6 +383,10 @@ class SpotifyAPI:
     def replace_playlist_tracks(self, playlist_id: str, track_ids: List[str]) -> int:
         """Replace all tracks in a playlist with new tracks.
         
+        Nothing is written if the playlist already holds exactly these tracks,
+        in this order. Otherwise the first page of tracks replaces the whole
+        playlist in one request and the rest are appended.
+        
         Args:
             playlist_id: Spotify playlist ID
             track_ids: List of Spotify track IDs to set as the playlist content
@@ -280,11 +394,20 @@ class SpotifyAPI:
         Returns:
             Number of tracks added to the playlist
         """
-        # First clear the playlist
-        self.clear_playlist(playlist_id)
+        current = [
+            item['track']['id']
+            for item in self._playlist_items(playlist_id, PLAYLIST_TRACK_ID_FIELDS)
+            if item['track'] and item['track']['id']
+        ]
+        if current == track_ids:
+            return len(track_ids)
         
-        # Then add the new tracks
-        return self.add_tracks_to_playlist(playlist_id, track_ids, check_duplicates=False)
+        # Replacing the items also clears the playlist, so there's no removal pass
+        first_page = track_ids[:100]
+        self.sp.playlist_replace_items(playlist_id, first_page)
+        return len(first_page) + self.add_tracks_to_playlist(
+            playlist_id, track_ids[100:], check_duplicates=False
+        )
     
     def update_playlist_details(self, playlist_id: str, name: Optional[str] = None,
                                description: Optional[str] = None, public: Optional[bool] = None) -> None:
@@ -305,4 +428,6 @@ class SpotifyAPI:
             kwargs['public'] = public
         
         if kwargs:
-            self.sp.playlist_change_details(playlist_id, **kwargs)
\ No newline at end of file
+            self.sp.playlist_change_details(playlist_id, **kwargs)
+            if name is not None:
+                self._playlist_name_index = None
\ No newline at end of file
@@ -1,72 +1,123 @@
 """Terminal User Interface for SpotSync."""
 
+import os
+import re
 import sys
 import json
+import time
+import asyncio
+import logging
 from pathlib import Path
-from typing import Optional, List
-from dataclasses import dataclass
+from typing import Optional, List, Dict, Set, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache
 
 from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical, ScrollableContainer
 from textual.widgets import Button, DataTable, Input, Label, Static, LoadingIndicator, Header, Footer, DirectoryTree, ProgressBar, Checkbox, Digits
+from textual.widgets.data_table import ColumnKey, RowKey
 from textual.screen import Screen
 from textual.reactive import reactive
+from textual.timer import Timer
+from textual.worker import Worker, WorkerError, WorkerState
 from rich.text import Text
 
 from .parser import M3U8Parser, Track
-from .matcher import TrackMatcher, MatchResult
+from .matcher import TrackMatcher, MatchResult, Candidate
 from .spotify_api import SpotifyAPI
 from .comparer import PlaylistComparer, ComparisonResult
 
 
-@dataclass
+logger = logging.getLogger(__name__)
+
+# Tracks searched on Spotify at the same time while matching
+SEARCH_CONCURRENCY = 8
+
+# Seconds between redraws of tracks table rows changed by matching
+TABLE_FLUSH_INTERVAL = 1 / 15
+
+# Minimum seconds between progress bar and status updates while matching
+PROGRESS_INTERVAL = 1 / 30
+
+# Seconds the file browser waits for browsing to settle before saving its directory
+CONFIG_SAVE_DELAY = 0.25
+
+# Seconds the user's playlists, fetched in the background, are reused by the compare screen
+PLAYLISTS_TTL = 60
+
+# Special characters removed from titles for the fallback search
+_CLEAN_TITLE_RE = re.compile(r'[^\w\s]')
+
+
+@dataclass(slots=True)
 class TrackMatch:
     """Container for track and its match result."""
     local_track: Track
     match_result: Optional[MatchResult] = None
     selected: bool = True
+    fallback_queries: Tuple[str, ...] = field(init=False, repr=False)  # Tried in order if the main query fails
+    clean_title: str = field(init=False, repr=False)  # Title and artist normalized for the matcher
+    clean_artist: str = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        track = self.local_track
+        fallback_queries = []
+        
+        # Search with just the title
+        if track.artist:
+            fallback_queries.append(track.title)
+        
+        # Search with cleaned title (remove special chars)
+        cleaned_title = _CLEAN_TITLE_RE.sub('', track.title)
+        if cleaned_title != track.title:
+            fallback_queries.append(f"{track.artist} {cleaned_title}" if track.artist else cleaned_title)
+        
+        self.fallback_queries = tuple(fallback_queries)
+        self.clean_title = TrackMatcher._clean_string(track.title)
+        self.clean_artist = TrackMatcher._clean_string(track.artist) if track.artist else ""
 
 
+@lru_cache(maxsize=None)
 def get_config_path() -> Path:
-    """Get the path to the config file."""
+    """Get the path to the config file, creating its directory on first use."""
     config_dir = Path.home() / ".spotsync"
     config_dir.mkdir(exist_ok=True)
     return config_dir / "config.json"
 
 
-def load_last_directory() -> str:
-    """Load the last used directory from config."""
+def load_config() -> dict:
+    """Load the config file, or an empty config if it is missing or unreadable."""
     try:
         config_path = get_config_path()
         if config_path.exists():
             with open(config_path, 'r') as f:
-                config = json.load(f)
-                last_dir = config.get('last_directory', '/')
-                # Verify the directory still exists
-                if Path(last_dir).exists():
-                    return last_dir
+                return json.load(f)
     except Exception:
         pass
-    return "/"
+    return {}
 
 
-def save_last_directory(directory: str) -> None:
-    """Save the last used directory to config."""
+def save_config(config: dict) -> None:
+    """Write the config file."""
     try:
-        config_path = get_config_path()
-        config = {}
-        if config_path.exists():
-            with open(config_path, 'r') as f:
-                config = json.load(f)
-        
-        config['last_directory'] = directory
-        
-        with open(config_path, 'w') as f:
+        with open(get_config_path(), 'w') as f:
             json.dump(config, f, indent=2)
     except Exception:
         pass  # Silently fail if we can't save config
 
 
+def load_last_directory(config: Optional[dict] = None) -> str:
+    """Load the last used directory from config (read from disk if not given)."""
+    if config is None:
+        config = load_config()
+    
+    last_dir = config.get('last_directory', '/')
+    # Verify the directory still exists
+    if Path(last_dir).exists():
+        return last_dir
+    return "/"
+
+
 class FileSelectionScreen(Screen):
     """Screen for selecting M3U8 files."""
     
@@ -95,7 +146,12 @@ class FileSelectionScreen(Screen):
     def __init__(self):
         super().__init__()
         self.selected_file: Optional[Path] = None
-        self.current_directory: str = load_last_directory()
+        
+        # Config is read once, in a worker thread on mount; until it arrives the
+        # tree shows the root. Directory changes are saved after a short idle delay
+        self._config: dict = {}
+        self._save_timer: Optional[Timer] = None
+        self.current_directory: str = "/"
     
     def compose(self) -> ComposeResult:
         """Create child widgets."""
@@ -117,24 +173,50 @@ class FileSelectionScreen(Screen):
         yield Static("Browse and select your M3U8 playlist file", id="status")
         yield Footer()
     
+    def on_mount(self) -> None:
+        """Look up widgets and start loading the config without blocking the UI."""
+        self._tree = self.query_one("#file-tree", DirectoryTree)
+        self._select_button = self.query_one("#select-file-button", Button)
+        self._status = self.query_one("#status", Static)
+        
+        self.run_worker(self._read_config, name="load-config", thread=True, exit_on_error=False)
+    
+    def _read_config(self) -> Tuple[dict, str]:
+        """Read the config and last used directory (runs in a worker thread)."""
+        config = load_config()
+        return config, load_last_directory(config)
+    
+    def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
+        """Open the last used directory once the config is loaded."""
+        if event.worker.name != "load-config" or event.state != WorkerState.SUCCESS:
+            return
+        
+        config, last_dir = event.worker.result
+        # Changes made while loading take precedence
+        browsed = 'last_directory' in self._config
+        self._config = {**config, **self._config}
+        
+        if not browsed and last_dir != self.current_directory:
+            self.current_directory = last_dir
+            self._tree.path = last_dir
+            self._tree.reload()
+    
     def on_directory_tree_file_selected(self, event: DirectoryTree.FileSelected) -> None:
         """Handle file selection in the directory tree."""
-        file_path = Path(event.path)
+        file_path = event.path
         
         # Save the current directory
-        save_last_directory(str(file_path.parent))
+        self._queue_save_dir(str(file_path.parent))
         
         # Check if it's an M3U8 file
-        if file_path.suffix.lower() in ['.m3u', '.m3u8']:
+        if file_path.name.lower().endswith(('.m3u', '.m3u8')):
             self.selected_file = file_path
-            self.query_one("#select-file-button", Button).disabled = False
-            status = self.query_one("#status", Static)
-            status.update(f"Selected: {file_path.name}")
+            self._select_button.disabled = False
+            self._status.update(f"Selected: {file_path.name}")
         else:
             self.selected_file = None
-            self.query_one("#select-file-button", Button).disabled = True
-            status = self.query_one("#status", Static)
-            status.update(f"Please select an M3U8 file (selected: {file_path.name})")
+            self._select_button.disabled = True
+            self._status.update(f"Please select an M3U8 file (selected: {file_path.name})")
     
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses."""
@@ -146,17 +228,36 @@ class FileSelectionScreen(Screen):
             # Reset directory tree to root directory
             root_dir = "/"
             self.current_directory = root_dir
-            save_last_directory(root_dir)
+            self._queue_save_dir(root_dir)
             # Refresh the directory tree
-            tree = self.query_one("#file-tree", DirectoryTree)
-            tree.path = root_dir
-            tree.reload()
+            self._tree.path = root_dir
+            self._tree.reload()
             self.selected_file = None
-            self.query_one("#select-file-button", Button).disabled = True
-            status = self.query_one("#status", Static)
-            status.update("Directory reset to /. Browse and select your M3U8 playlist file")
+            self._select_button.disabled = True
+            self._status.update("Directory reset to /. Browse and select your M3U8 playlist file")
         elif event.button.id == "cancel-button":
             self.app.pop_screen()
+    
+    def _queue_save_dir(self, directory: str) -> None:
+        """Remember the directory and save it once browsing settles."""
+        if self._config.get('last_directory') == directory:
+            return  # Already saved (or about to be); clicks within a folder are free
+        
+        self._config['last_directory'] = directory
+        if self._save_timer is not None:
+            self._save_timer.stop()
+        self._save_timer = self.set_timer(CONFIG_SAVE_DELAY, self._flush_config)
+    
+    def _flush_config(self) -> None:
+        """Write a pending directory change to the config file."""
+        if self._save_timer is not None:
+            self._save_timer.stop()
+            self._save_timer = None
+            save_config(self._config)
+    
+    def on_unmount(self) -> None:
+        """Save a pending directory change before the screen goes away."""
+        self._flush_config()
 
 
 class PlaylistSelectionScreen(Screen):
@@ -223,7 +324,11 @@ class PlaylistSelectionScreen(Screen):
     
     async def on_mount(self) -> None:
         """Load user's playlists when screen mounts."""
-        table = self.query_one("#playlists-table", DataTable)
+        self._table = self.query_one("#playlists-table", DataTable)
+        self._compare_button = self.query_one("#compare-button", Button)
+        self._status = self.query_one("#status", Static)
+        
+        table = self._table
         table.add_columns("Name", "Tracks")
         table.cursor_type = "row"
         
@@ -233,92 +338,92 @@ class PlaylistSelectionScreen(Screen):
     async def load_playlists(self) -> None:
         """Load user's Spotify playlists."""
         try:
-            spotify = SpotifyAPI()
-            self.playlists = spotify.get_user_playlists(limit=50)
+            self.playlists = self.app.cached_playlists()
+            if self.playlists is None:
+                if not self.app.spotify:
+                    self._status.update("Spotify not connected")
+                    return
+                self.playlists = await asyncio.to_thread(self.app.spotify.get_user_playlists, 50)
             
-            table = self.query_one("#playlists-table", DataTable)
+            table = self._table
             table.clear()
             
             for playlist in self.playlists:
                 table.add_row(playlist['name'], str(playlist['tracks']['total']))
             
-            self.query_one("#status", Static).update(f"Found {len(self.playlists)} playlists")
+            self._status.update(f"Found {len(self.playlists)} playlists")
         except Exception as e:
-            self.query_one("#status", Static).update(f"Error loading playlists: {str(e)}")
+            self._status.update(f"Error loading playlists: {str(e)}")
     
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         """Handle playlist selection."""
         if event.cursor_row < len(self.playlists):
             self.selected_playlist = self.playlists[event.cursor_row]
-            self.query_one("#compare-button", Button).disabled = False
-            self.query_one("#status", Static).update(f"Selected: {self.selected_playlist['name']}")
+            self._compare_button.disabled = False
+            self._status.update(f"Selected: {self.selected_playlist['name']}")
     
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses."""
         if event.button.id == "compare-button":
             if self.selected_playlist:
                 playlist_name = self.selected_playlist['name']
-                self.query_one("#status", Static).update(f"Starting comparison...")
+                self._status.update(f"Starting comparison...")
                 
-                # Do the comparison synchronously 
+                # Spotify calls and matching run in worker threads, so the status stays live
                 try:
-                    # Get the comparison result - SYNCHRONOUS
-                    result = self._do_comparison(playlist_name)
+                    result = await self._do_comparison(playlist_name)
                     if result:
                         # Push results screen directly (no pop needed)
                         self.app.push_screen(result)
                     else:
-                        self.query_one("#status", Static).update("Comparison failed")
+                        self._status.update("Comparison failed")
                 except Exception as e:
                     error_msg = f"Error: {str(e)}"
-                    self.query_one("#status", Static).update(error_msg)
+                    self._status.update(error_msg)
         elif event.button.id == "cancel-button":
             self.app.pop_screen()
     
-    def _do_comparison(self, spotify_name: str):
+    async def _do_comparison(self, spotify_name: str):
         """Do the comparison and return results screen."""
         try:
             app = self.app
             
             # Check prerequisites
             if not app.spotify:
-                self.query_one("#status", Static).update("Spotify not connected")
+                self._status.update("Spotify not connected")
                 return None
                 
             if not app.tracks:
-                self.query_one("#status", Static).update("No tracks loaded")
+                self._status.update("No tracks loaded")
                 return None
             
             # Find Spotify playlist
-            self.query_one("#status", Static).update(f"Finding playlist '{spotify_name}'...")
-            playlist_id = app.spotify.find_playlist_by_name(spotify_name)
+            self._status.update(f"Finding playlist '{spotify_name}'...")
+            playlist_id = await asyncio.to_thread(app.spotify.find_playlist_by_name, spotify_name)
             if not playlist_id:
-                self.query_one("#status", Static).update(f"Playlist '{spotify_name}' not found")
+                self._status.update(f"Playlist '{spotify_name}' not found")
                 return None
             
             # Get detailed tracks from Spotify
-            self.query_one("#status", Static).update(f"Fetching tracks...")
-            spotify_tracks = app.spotify.get_playlist_tracks_detailed(playlist_id)
+            self._status.update(f"Fetching tracks...")
+            spotify_tracks = await asyncio.to_thread(app.spotify.get_playlist_tracks_detailed, playlist_id)
             
             # Convert local tracks to the format expected by comparer
             local_tracks = [tm.local_track for tm in app.tracks]
             
             # Compare playlists
-            self.query_one("#status", Static).update(f"Comparing playlists...")
-            from .comparer import PlaylistComparer
-            comparer = PlaylistComparer(app.matcher)
-            result = comparer.compare_playlists(local_tracks, spotify_tracks)
+            self._status.update(f"Comparing playlists...")
+            result = await asyncio.to_thread(app.comparer.compare_playlists, local_tracks, spotify_tracks)
             
             # Create results screen
-            from pathlib import Path
             m3u8_name = Path(app.selected_file_path).stem if app.selected_file_path else "M3U8"
             
-            self.query_one("#status", Static).update("Comparison complete!")
+            self._status.update("Comparison complete!")
             return ComparisonResultsScreen(result, m3u8_name, spotify_name)
             
         except Exception as e:
             error_msg = f"Error: {str(e)}"
-            self.query_one("#status", Static).update(error_msg)
+            self._status.update(error_msg)
             return None
 
 
@@ -395,7 +500,7 @@ class ComparisonResultsScreen(Screen):
             summary_text = (
                 f"📊 Local tracks: [bold cyan]{self.result.total_local}[/bold cyan] | "
                 f"Spotify tracks: [bold cyan]{self.result.total_spotify}[/bold cyan] | "
-                f"Matched: [bold green]{len(self.result.matched)}[/bold green] "
+                f"Matched: [bold green]{len(self.result.matched_local)}[/bold green] "
                 f"({self.result.match_percentage:.1f}%)"
             )
             yield Static(summary_text)
@@ -421,9 +526,9 @@ class ComparisonResultsScreen(Screen):
                 yield Static("No tracks found only in Spotify")
             
             # Matched section
-            yield Static(f"[green]✅ Matched tracks ({len(self.result.matched)})[/green]", 
+            yield Static(f"[green]✅ Matched tracks ({len(self.result.matched_local)})[/green]", 
                        classes="section-header")
-            if self.result.matched:
+            if self.result.matched_local:
                 matched_table = DataTable(id="matched-table")
                 yield matched_table
             else:
@@ -434,37 +539,48 @@ class ComparisonResultsScreen(Screen):
             yield Button("Back", variant="default", id="back-button")
     
     def on_mount(self) -> None:
-        """Populate tables when screen mounts."""
+        """Populate the top table now and the ones below it once the screen is drawn."""
+        # Each table gets all its rows in one call, so it refreshes once rather than per row
         try:
             # Local only table
             if self.result.local_only:
                 table = self.query_one("#local-only-table", DataTable)
                 table.add_columns("Artist", "Title")
-                for track in self.result.local_only:
-                    table.add_row(track.artist or "-", track.title)
+                table.add_rows((track.artist or "-", track.title) for track in self.result.local_only)
             
+        except Exception as e:
+            self._show_error(e)
+        
+        # Large comparisons would otherwise hold up the screen transition
+        self.call_after_refresh(self._populate_lower_tables)
+    
+    def _populate_lower_tables(self) -> None:
+        """Populate the Spotify-only and matched tables."""
+        try:
             # Spotify only table
             if self.result.spotify_only:
                 table = self.query_one("#spotify-only-table", DataTable)
                 table.add_columns("Artist", "Title")
-                for track in self.result.spotify_only:
-                    table.add_row(track["artists"], track["name"])
+                table.add_rows((track["artists"], track["name"]) for track in self.result.spotify_only)
             
             # Matched table (showing all)
-            if self.result.matched:
+            if self.result.matched_local:
                 table = self.query_one("#matched-table", DataTable)
                 table.add_columns("Local", "Spotify")
-                for local, spotify in self.result.matched:
-                    local_str = f"{local.artist or '-'} - {local.title}"
-                    spotify_str = f"{spotify['artists']} - {spotify['name']}"
-                    table.add_row(local_str, spotify_str)
+                table.add_rows(
+                    (f"{local.artist or '-'} - {local.title}", f"{spotify['artists']} - {spotify['name']}")
+                    for local, spotify in zip(self.result.matched_local, self.result.matched_spotify)
+                )
             
         except Exception as e:
-            # Log any errors during mount
-            error_msg = f"Error displaying results: {str(e)}"
-            import traceback
-            traceback.print_exc()
-            self.app.update_status(error_msg, "red")
+            self._show_error(e)
+    
+    def _show_error(self, e: Exception) -> None:
+        """Report an error raised while populating the tables."""
+        # Log the full traceback for debugging (the terminal belongs to the TUI)
+        error_msg = f"Error displaying results: {str(e)}"
+        logger.debug("Exception in ComparisonResultsScreen", exc_info=e)
+        self.app.update_status(error_msg, "red")
     
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses."""
@@ -559,9 +675,26 @@ class SpotSyncApp(App):
         self.tracks: List[TrackMatch] = []
         self.spotify: Optional[SpotifyAPI] = None
         self.matcher = TrackMatcher(threshold=0.83)  # Slightly lowered to catch edge cases like features
+        self.comparer = PlaylistComparer(self.matcher)
         self.playlist_name = ""
         self.selected_file_path: Optional[str] = None
         
+        # Spotify searches by normalized query, shared by identical queries
+        self._searches: Dict[str, "asyncio.Future[List[Dict]]"] = {}
+        
+        # Indices of tracks whose table row is out of date
+        self._dirty_rows: Set[int] = set()
+        
+        # Search & Match worker, so it can be cancelled
+        self._match_worker: Optional[Worker] = None
+        
+        # Tracks table keys, so single cells can be updated in place
+        self._column_keys: List[ColumnKey] = []
+        self._row_keys: List[RowKey] = []
+        
+        # User's playlists fetched ahead of the compare screen, as (monotonic time, playlists)
+        self._playlists: Optional[Tuple[float, List[Dict]]] = None
+        
     def compose(self) -> ComposeResult:
         """Create child widgets."""
         yield Header()
@@ -588,6 +721,7 @@ class SpotSyncApp(App):
             yield Static("")  # Spacer
             with Horizontal():
                 yield Button("Search & Match", variant="primary", id="match-button", disabled=True)
+                yield Button("Cancel", variant="error", id="cancel-match-button", disabled=True)
                 yield Button("Create Playlist", variant="success", id="create-button", disabled=True)
                 yield Button("Compare with Spotify", variant="warning", id="compare-button", disabled=True)
                 yield Button("Select All", id="select-all-button")
@@ -598,13 +732,30 @@ class SpotSyncApp(App):
     
     def on_mount(self) -> None:
         """Initialize the tracks table."""
-        table = self.query_one("#tracks-table", DataTable)
-        table.add_columns("✓", "Artist", "Title", "Match", "Confidence")
+        # Widgets the app updates, looked up once
+        self._status = self.query_one("#status", Static)
+        self._status_shown: Optional[Tuple[str, str]] = None
+        self._tracks_table = self.query_one("#tracks-table", DataTable)
+        self._progress = self.query_one("#progress-bar", ProgressBar)
+        self._match_button = self.query_one("#match-button", Button)
+        self._create_button = self.query_one("#create-button", Button)
+        self._cancel_button = self.query_one("#cancel-match-button", Button)
+        self._playlist_input = self.query_one("#playlist-input", Input)
+        self._file_display = self.query_one("#file-display", Static)
+        self._browse_button = self.query_one("#browse-button", Button)
+        self._load_button = self.query_one("#load-button", Button)
+        self._compare_button = self.query_one("#compare-button", Button)
+        self._replace_mode = self.query_one("#replace-mode", Checkbox)
+        
+        table = self._tracks_table
+        self._column_keys = table.add_columns("✓", "Artist", "Title", "Match", "Confidence")
         table.cursor_type = "row"
         
+        # Redraw rows changed by matching in batches rather than after every track
+        self.set_interval(TABLE_FLUSH_INTERVAL, self._flush_dirty_rows)
+        
         # Hide progress bar initially
-        progress = self.query_one("#progress-bar", ProgressBar)
-        progress.display = False
+        self._progress.display = False
         
         # Try to initialize Spotify
         try:
@@ -612,11 +763,53 @@ class SpotSyncApp(App):
             self.update_status("Spotify connected", "green")
         except Exception as e:
             self.update_status(f"Spotify error: {str(e)}", "red")
+            return
+        
+        # Fetch playlists now so the compare screen doesn't wait for them
+        self.run_worker(self._prefetch_playlists, name="prefetch-playlists", thread=True, exit_on_error=False)
+    
+    def _prefetch_playlists(self) -> None:
+        """Fetch the user's playlists (runs in a worker thread)."""
+        self._playlists = (time.monotonic(), self.spotify.get_user_playlists(limit=50))
+    
+    def cached_playlists(self) -> Optional[List[Dict]]:
+        """Get the prefetched playlists, or None if missing or older than PLAYLISTS_TTL."""
+        if self._playlists is None:
+            return None
+        
+        fetched_at, playlists = self._playlists
+        if time.monotonic() - fetched_at > PLAYLISTS_TTL:
+            return None
+        return playlists
+    
+    def on_unmount(self) -> None:
+        """Stop matching when the app closes, so no more searches are sent."""
+        if self._match_worker is not None:
+            self._match_worker.cancel()
+    
+    @property
+    def matching(self) -> bool:
+        """Whether Search & Match is running."""
+        return self._match_worker is not None and not self._match_worker.is_finished
+    
+    async def _stop_matching(self) -> None:
+        """Cancel Search & Match, if running, and wait until it has stopped."""
+        if not self.matching:
+            return
+        
+        worker = self._match_worker
+        worker.cancel()
+        try:
+            await worker.wait()
+        except WorkerError:
+            pass  # Cancelled before it finished, which is what was asked for
     
     def update_status(self, message: str, style: str = "white") -> None:
-        """Update the status bar."""
-        status = self.query_one("#status", Static)
-        status.update(Text(message, style=style))
+        """Update the status bar, unless it already shows this message."""
+        if (message, style) == self._status_shown:
+            return
+        self._status_shown = (message, style)
+        self._status.update(Text(message, style=style))
     
     async def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses."""
@@ -625,7 +818,13 @@ class SpotSyncApp(App):
         elif event.button.id == "load-button":
             await self.load_m3u8()
         elif event.button.id == "match-button":
-            await self.match_tracks()
+            # Run in the background so the Cancel button can still be handled
+            self._match_worker = self.run_worker(
+                self.match_tracks(), name="match-tracks", group="match", exclusive=True
+            )
+        elif event.button.id == "cancel-match-button":
+            if self._match_worker is not None:
+                self._match_worker.cancel()
         elif event.button.id == "create-button":
             await self.create_playlist()
         elif event.button.id == "select-all-button":
@@ -640,11 +839,11 @@ class SpotSyncApp(App):
         self.selected_file_path = file_path
         
         # Update the display
-        file_display = self.query_one("#file-display", Static)
+        file_display = self._file_display
         file_display.update(Path(file_path).name)
         
         # Enable the load button
-        self.query_one("#load-button", Button).disabled = False
+        self._load_button.disabled = False
         
         self.update_status(f"File selected: {Path(file_path).name}", "green")
     
@@ -656,29 +855,35 @@ class SpotSyncApp(App):
         
         file_path = self.selected_file_path
         
+        # Matching writes to the tracks being replaced, so it has to stop first
+        await self._stop_matching()
+        
         try:
             self.update_status("Loading M3U8 file...", "cyan")
             parser = M3U8Parser()
-            tracks = parser.parse(file_path)
+            
+            # Read the file and prepare the tracks in a worker thread, keeping the UI responsive
+            tracks = await asyncio.to_thread(
+                lambda: [TrackMatch(track) for track in parser.iter_parse(file_path)]
+            )
             
             if not tracks:
                 self.update_status("No tracks found in file", "yellow")
                 return
             
             # Store tracks and update playlist name
-            self.tracks = [TrackMatch(track) for track in tracks]
+            self.tracks = tracks
             self.playlist_name = parser.playlist_name or Path(file_path).stem
             
             # Update playlist input
-            playlist_input = self.query_one("#playlist-input", Input)
-            playlist_input.value = self.playlist_name
+            self._playlist_input.value = self.playlist_name
             
             # Update table
             self.update_tracks_table()
             
             # Enable match and compare buttons
-            self.query_one("#match-button", Button).disabled = False
-            self.query_one("#compare-button", Button).disabled = False
+            self._match_button.disabled = False
+            self._compare_button.disabled = False
             
             self.update_status(f"Loaded {len(tracks)} tracks", "green")
             
@@ -687,27 +892,48 @@ class SpotSyncApp(App):
     
     def update_tracks_table(self) -> None:
         """Update the tracks table display."""
-        table = self.query_one("#tracks-table", DataTable)
+        table = self._tracks_table
         table.clear()
+        self._dirty_rows.clear()
         
-        for track_match in self.tracks:
-            track = track_match.local_track
-            match = track_match.match_result
-            
-            check = "✓" if track_match.selected else " "
-            artist = track.artist or "-"
-            title = track.title
-            
-            if match:
-                match_text = f"{match.matched_artist} - {match.matched_title}"
-                confidence = f"{match.confidence:.0%}"
-                row_style = "green" if match.confidence >= 0.9 else "yellow"
-            else:
-                match_text = "-"
-                confidence = "-"
-                row_style = "dim"
-            
-            table.add_row(check, artist, title, match_text, confidence)
+        self._row_keys = table.add_rows(self._row_cells(track_match) for track_match in self.tracks)
+    
+    def _update_row(self, i: int, columns: Tuple[int, ...]) -> None:
+        """Rewrite the given cells of a track's row in place."""
+        if i >= len(self._row_keys):
+            return
+        
+        table = self._tracks_table
+        cells = self._row_cells(self.tracks[i])
+        for column in columns:
+            table.update_cell(self._row_keys[i], self._column_keys[column], cells[column], update_width=True)
+    
+    def _row_cells(self, track_match: TrackMatch) -> Tuple[str, ...]:
+        """Get the tracks table cells for a track."""
+        track = track_match.local_track
+        match = track_match.match_result
+        
+        check = "✓" if track_match.selected else " "
+        artist = track.artist or "-"
+        title = track.title
+        
+        if match:
+            match_text = f"{match.matched_artist} - {match.matched_title}"
+            confidence = f"{match.confidence:.0%}"
+        else:
+            match_text = "-"
+            confidence = "-"
+        
+        return check, artist, title, match_text, confidence
+    
+    def _flush_dirty_rows(self) -> None:
+        """Redraw the check, match and confidence cells of changed rows."""
+        if not self._dirty_rows:
+            return
+        
+        for i in sorted(self._dirty_rows):
+            self._update_row(i, (0, 3, 4))
+        self._dirty_rows.clear()
     
     async def match_tracks(self) -> None:
         """Search and match tracks on Spotify."""
@@ -722,124 +948,184 @@ class SpotSyncApp(App):
         self.update_status(f"Searching for {len(self.tracks)} tracks...", "cyan")
         
         # Show and initialize progress bar
-        progress = self.query_one("#progress-bar", ProgressBar)
+        progress = self._progress
         progress.display = True
         progress.update(total=len(self.tracks), progress=0)
         
-        # Disable buttons during search
-        self.query_one("#match-button", Button).disabled = True
-        self.query_one("#create-button", Button).disabled = True
+        # Disable buttons during search, including those that replace or read the tracks
+        self._match_button.disabled = True
+        self._create_button.disabled = True
+        self._browse_button.disabled = True
+        self._load_button.disabled = True
+        self._compare_button.disabled = True
+        self._cancel_button.disabled = False
         
+        matched_count = 0
         try:
-            # Build search queries
-            queries = []
-            for track_match in self.tracks:
-                track = track_match.local_track
-                if track.artist:
-                    query = f"{track.artist} {track.title}"
-                else:
-                    query = track.title
-                queries.append(query)
-            
-            # Search in batches
-            matched_count = 0
-            for i, track_match in enumerate(self.tracks):
-                query = queries[i]
-                results = self.spotify.search_track(query, limit=10)  # Increased limit
-                
-                if results:
-                    match = self.matcher.match_track(
-                        track_match.local_track.title,
-                        track_match.local_track.artist,
-                        results
-                    )
-                    if match:
-                        track_match.match_result = match
+            # Search concurrently; each search runs in a worker thread so the UI stays responsive
+            semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+            
+            async def match_bounded(i: int, track_match: TrackMatch) -> bool:
+                async with semaphore:
+                    matched = await self._match_track(track_match)
+                self._dirty_rows.add(i)
+                return matched
+            
+            tasks = [
+                asyncio.create_task(match_bounded(i, track_match))
+                for i, track_match in enumerate(self.tracks)
+            ]
+            
+            last_progress = 0.0
+            try:
+                for completed, task in enumerate(asyncio.as_completed(tasks), 1):
+                    if await task:
                         matched_count += 1
-                    else:
-                        # Try alternative search strategies for unmatched tracks
-                        track = track_match.local_track
-                        alternative_match = None
-                        
-                        # Try search with just the title
-                        if track.artist and not alternative_match:
-                            title_only_results = self.spotify.search_track(track.title, limit=10)
-                            if title_only_results:
-                                alternative_match = self.matcher.match_track(
-                                    track.title, track.artist, title_only_results
-                                )
-                        
-                        # Try search with cleaned title (remove special chars)
-                        if not alternative_match:
-                            import re
-                            cleaned_title = re.sub(r'[^\w\s]', '', track.title)
-                            if cleaned_title != track.title:
-                                clean_query = f"{track.artist} {cleaned_title}" if track.artist else cleaned_title
-                                clean_results = self.spotify.search_track(clean_query, limit=10)
-                                if clean_results:
-                                    alternative_match = self.matcher.match_track(
-                                        track.title, track.artist, clean_results
-                                    )
-                        
-                        if alternative_match:
-                            track_match.match_result = alternative_match
-                            matched_count += 1
-                            print(f"DEBUG: Alternative match found for '{query}': {alternative_match.matched_artist} - {alternative_match.matched_title}")
-                        else:
-                            # Debug: Log unmatched tracks with detailed scoring
-                            print(f"DEBUG: No match for '{query}' - Got {len(results)} results")
-                            if results and len(results) > 0:
-                                for j, result in enumerate(results[:3]):  # Show top 3
-                                    artist_name = result.get('artists', [{}])[0].get('name', 'Unknown')
-                                    track_name = result.get('name', 'Unknown')
-                                    print(f"  Result {j+1}: {artist_name} - {track_name}")
-                                    
-                                    # Calculate and show the score manually for debugging
-                                    from Levenshtein import ratio
-                                    title_score = ratio(track.title.lower(), track_name.lower())
-                                    artist_score = ratio(track.artist.lower() if track.artist else "", artist_name.lower()) if track.artist else 0
-                                    if track.artist and artist_score < 0.6:
-                                        total_score = (title_score * 0.4) + (artist_score * 0.6)
-                                    else:
-                                        total_score = (title_score * 0.6) + (artist_score * 0.4) if track.artist else title_score
-                                    print(f"    Title: {title_score:.2f}, Artist: {artist_score:.2f}, Total: {total_score:.2f} (threshold: 0.85)")
-                else:
-                    print(f"DEBUG: No search results for '{query}'")
-                
-                # Update progress bar and status
-                progress.update(progress=i+1)
-                self.update_status(f"Searching... {i+1}/{len(self.tracks)} (matched: {matched_count})", "cyan")
-                
-                # Allow UI to update every few tracks
-                if i % 3 == 0:  # Update UI every 3 tracks for more responsive feedback
-                    self.update_tracks_table()  # Update table to show new matches
-                    self.refresh()  # Force refresh of the UI
-                    import asyncio
-                    await asyncio.sleep(0.01)  # Brief yield to allow UI update
-            
-            # Update table with results
-            self.update_tracks_table()
+                    
+                    # Update progress bar and status, at most PROGRESS_INTERVAL apart
+                    # (cached searches complete far faster than can be seen)
+                    now = time.monotonic()
+                    if now - last_progress >= PROGRESS_INTERVAL or completed == len(tasks):
+                        last_progress = now
+                        progress.update(progress=completed)
+                        self.update_status(f"Searching... {completed}/{len(self.tracks)} (matched: {matched_count})", "cyan")
+            finally:
+                for task in tasks:
+                    task.cancel()
+            
+            # Show the last matches without waiting for the next flush
+            self._flush_dirty_rows()
             
             # Hide progress bar
             progress.display = False
             
             # Enable create button if we have matches
             if matched_count > 0:
-                self.query_one("#create-button", Button).disabled = False
+                self._create_button.disabled = False
             
             self.update_status(f"Matched {matched_count}/{len(self.tracks)} tracks", "green")
             
             # Show notification with results
             self.notify(f"Track matching complete: {matched_count}/{len(self.tracks)} tracks matched", severity="information")
             
+        except asyncio.CancelledError:
+            if not self.is_running:
+                raise  # The app is closing and its widgets are gone
+            
+            # Keep the matches found so far; searches already sent finish in the background
+            self._flush_dirty_rows()
+            if matched_count > 0:
+                self._create_button.disabled = False
+            self.update_status(f"Matching cancelled: {matched_count}/{len(self.tracks)} tracks matched", "yellow")
         except Exception as e:
             self.update_status(f"Error: {str(e)}", "red")
             self.notify(f"Error during matching: {str(e)}", severity="error")
         finally:
             # Hide progress bar and re-enable buttons
-            progress = self.query_one("#progress-bar", ProgressBar)
-            progress.display = False
-            self.query_one("#match-button", Button).disabled = False
+            if self.is_running:
+                progress.display = False
+                self._match_button.disabled = False
+                self._cancel_button.disabled = True
+                self._browse_button.disabled = False
+                self._load_button.disabled = not self.selected_file_path
+                self._compare_button.disabled = False
+    
+    async def _match_track(self, track_match: TrackMatch) -> bool:
+        """Search Spotify for one track, trying alternative queries if needed.
+        
+        Searches run in a worker thread, so several tracks can be matched at once.
+        
+        Returns:
+            True if a match was found and stored on track_match
+        """
+        query = track_match.local_track.query
+        results = await self._search(query)
+        
+        if not results:
+            logger.debug("No search results for '%s'", query)
+            return False
+        
+        # Every search result is scored against the same normalized track
+        track = track_match.local_track
+        clean = dict(clean_title=track_match.clean_title, clean_artist=track_match.clean_artist)
+        threshold = self.matcher.threshold
+        
+        candidates = [c for c in map(self.matcher.prepare_candidate, results) if c is not None]
+        best, best_score = self.matcher.best_candidate(track.title, track.artist, candidates, **clean)
+        if best is not None and best_score >= threshold:
+            track_match.match_result = self._match_result(track_match, best, best_score)
+            return True
+        
+        # Try alternative search strategies for unmatched tracks. Tracks that
+        # an earlier search already returned scored below the threshold, so
+        # only the new ones are scored
+        seen = {candidate.spotify_id for candidate in candidates}
+        for fallback_query in track_match.fallback_queries:
+            fallback_results = await self._search(fallback_query)
+            fresh = [c for c in map(self.matcher.prepare_candidate, fallback_results or [])
+                     if c is not None and c.spotify_id not in seen]
+            seen.update(candidate.spotify_id for candidate in fresh)
+            
+            candidate, score = self.matcher.best_candidate(track.title, track.artist, fresh, **clean)
+            if candidate is not None and score >= threshold:
+                track_match.match_result = self._match_result(track_match, candidate, score)
+                logger.debug("Alternative match found for '%s': %s - %s", query,
+                             candidate.artist, candidate.title)
+                return True
+            if score > best_score:
+                best, best_score = candidate, score
+        
+        # Debug: Log unmatched tracks with detailed scoring (skipped entirely unless enabled)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("No match for '%s' - Got %d results", query, len(results))
+            if best is not None:
+                logger.debug("  Closest: %s - %s (score: %.2f, threshold: %.2f)",
+                             best.artist, best.title, best_score, threshold)
+            
+            # Score the top 3 results exactly as the matcher did, in one batch
+            top = candidates[:3]
+            scores = self.matcher.score_matrix([track_match.clean_title], [track_match.clean_artist], top)
+            for j, (candidate, score) in enumerate(zip(top, scores[0] if top else [])):
+                logger.debug("  Result %d: %s - %s (score: %.2f, threshold: %.2f)",
+                             j + 1, candidate.artist, candidate.title, score, threshold)
+        return False
+    
+    @staticmethod
+    def _match_result(track_match: TrackMatch, candidate: Candidate, score: float) -> MatchResult:
+        """Build the match record for a candidate that met the threshold."""
+        track = track_match.local_track
+        return MatchResult(
+            spotify_id=candidate.spotify_id,
+            confidence=score,
+            matched_title=candidate.title,
+            matched_artist=candidate.artist,
+            original_title=track.title,
+            original_artist=track.artist
+        )
+    
+    async def _search(self, query: str) -> List[Dict]:
+        """Search Spotify in a worker thread, reusing results for identical queries.
+        
+        Queries that differ only in case or surrounding whitespace are sent once
+        per session; concurrent duplicates wait for the same request. Empty
+        results (which include failed searches) are not kept, so they are
+        retried on the next run.
+        """
+        key = query.strip().lower()
+        search = self._searches.get(key)
+        if search is None:
+            search = asyncio.ensure_future(asyncio.to_thread(self.spotify.search_track, query, 10))
+            self._searches[key] = search
+        
+        # Shielded so a cancelled waiter doesn't cancel the search for the others
+        try:
+            results = await asyncio.shield(search)
+        except Exception:
+            self._searches.pop(key, None)
+            raise
+        if not results:
+            self._searches.pop(key, None)
+        return results
     
     async def create_playlist(self) -> None:
         """Create Spotify playlist with matched tracks."""
@@ -857,22 +1143,23 @@ class SpotSyncApp(App):
             self.update_status("No matched tracks selected", "yellow")
             return
         
-        playlist_input = self.query_one("#playlist-input", Input)
-        playlist_name = playlist_input.value.strip() or self.playlist_name
+        playlist_name = self._playlist_input.value.strip() or self.playlist_name
         
         if not playlist_name:
             self.update_status("Please enter a playlist name", "yellow")
             return
         
         # Get configuration options
-        replace_mode = self.query_one("#replace-mode", Checkbox).value
+        replace_mode = self._replace_mode.value
         public_mode = True  # Always create public playlists
         
         try:
             self.update_status("Creating playlist...", "cyan")
+            self._playlists = None  # Names and track counts are about to change
             
             # Check if playlist exists
-            playlist_id = self.spotify.playlist_exists(playlist_name)
+            playlist_id = await asyncio.to_thread(self.spotify.playlist_exists, playlist_name)
+            existing = None  # Track IDs already in the playlist, when known without fetching it
             
             if playlist_id:
                 # Playlist exists
@@ -884,23 +1171,27 @@ class SpotSyncApp(App):
                     self.notify(f"Updating existing playlist: {playlist_name}", severity="information")
             else:
                 # Create new playlist (always public)
-                playlist_id = self.spotify.create_playlist(
+                playlist_id = await asyncio.to_thread(
+                    self.spotify.create_playlist,
                     name=playlist_name,
                     description="Created by SpotSync",
                     public=True
                 )
+                existing = set()
                 self.update_status(f"Created playlist '{playlist_name}'", "green")
                 self.notify(f"Successfully created playlist: {playlist_name}", severity="information")
             
             # Handle tracks based on mode
             track_ids = [tm.match_result.spotify_id for tm in selected_matches]
             
-            if replace_mode and playlist_id:
+            if replace_mode and existing is None:
                 # Replace entire playlist
-                added_count = self.spotify.replace_playlist_tracks(playlist_id, track_ids)
+                added_count = await asyncio.to_thread(self.spotify.replace_playlist_tracks, playlist_id, track_ids)
             else:
-                # Add tracks to playlist
-                added_count = self.spotify.add_tracks_to_playlist(playlist_id, track_ids)
+                # Add tracks to playlist; a new one is empty, so there's nothing to replace
+                added_count = await asyncio.to_thread(
+                    self.spotify.add_tracks_to_playlist, playlist_id, track_ids, existing=existing
+                )
             
             # Update status based on mode
             if replace_mode:
@@ -937,8 +1228,7 @@ class SpotSyncApp(App):
             return
         
         # Get the current playlist name as suggestion
-        playlist_input = self.query_one("#playlist-input", Input)
-        suggested_name = playlist_input.value.strip() or self.playlist_name
+        suggested_name = self._playlist_input.value.strip() or self.playlist_name
         
         # Push playlist selection screen - comparison will be handled in the screen itself
         track_count = len(self.tracks)
@@ -960,14 +1250,14 @@ class SpotSyncApp(App):
             
             # Find Spotify playlist
             self.update_status(f"Finding playlist '{spotify_name}'...", "cyan")
-            playlist_id = self.spotify.find_playlist_by_name(spotify_name)
+            playlist_id = await asyncio.to_thread(self.spotify.find_playlist_by_name, spotify_name)
             if not playlist_id:
                 self.update_status(f"Spotify playlist '{spotify_name}' not found", "red")
                 return
             
             # Get detailed tracks from Spotify
             self.update_status(f"Fetching tracks from '{spotify_name}'...", "cyan")
-            spotify_tracks = self.spotify.get_playlist_tracks_detailed(playlist_id)
+            spotify_tracks = await asyncio.to_thread(self.spotify.get_playlist_tracks_detailed, playlist_id)
             self.update_status(f"Found {len(spotify_tracks)} Spotify tracks", "cyan")
             
             # Convert local tracks to the format expected by comparer
@@ -975,39 +1265,50 @@ class SpotSyncApp(App):
             self.update_status(f"Comparing {len(local_tracks)} local tracks...", "cyan")
             
             # Compare playlists
-            comparer = PlaylistComparer(self.matcher)
-            result = comparer.compare_playlists(local_tracks, spotify_tracks)
+            result = await asyncio.to_thread(self.comparer.compare_playlists, local_tracks, spotify_tracks)
             
             # Show comparison results immediately
             m3u8_name = Path(self.selected_file_path).stem if self.selected_file_path else "M3U8"
             self.push_screen(ComparisonResultsScreen(result, m3u8_name, spotify_name))
             
-            self.update_status(f"Comparison complete: {len(result.matched)} matched, "
+            self.update_status(f"Comparison complete: {len(result.matched_local)} matched, "
                               f"{len(result.local_only)} local only, "
                               f"{len(result.spotify_only)} spotify only", "green")
             
         except Exception as e:
-            import traceback
             self.update_status(f"Error comparing: {str(e)}", "red")
             # Log the full traceback for debugging
-            print(f"DEBUG: Exception in perform_comparison: {traceback.format_exc()}")
+            logger.debug("Exception in perform_comparison", exc_info=True)
     
     def select_all_tracks(self, select: bool) -> None:
         """Select or deselect all tracks."""
-        for track_match in self.tracks:
-            track_match.selected = select
-        self.update_tracks_table()
+        for i, track_match in enumerate(self.tracks):
+            # Only rows whose selection changes need redrawing
+            if track_match.selected != select:
+                track_match.selected = select
+                self._update_row(i, (0,))
     
     def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
         """Handle row selection in the tracks table."""
         if 0 <= event.cursor_row < len(self.tracks):
             # Toggle selection
             self.tracks[event.cursor_row].selected = not self.tracks[event.cursor_row].selected
-            self.update_tracks_table()
+            self._update_row(event.cursor_row, (0,))
 
 
 def main():
-    """Run the TUI application."""
+    """Run the TUI application.
+    
+    Set SPOTSYNC_DEBUG to write debug logs to ~/.spotsync/debug.log
+    (the terminal belongs to the TUI).
+    """
+    if os.environ.get("SPOTSYNC_DEBUG"):
+        logging.basicConfig(
+            filename=get_config_path().parent / "debug.log",
+            level=logging.DEBUG,
+            format="%(asctime)s %(name)s %(levelname)s %(message)s"
+        )
+    
     app = SpotSyncApp()
     app.run()
 
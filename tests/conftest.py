@@ -0,0 +1,45 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+import pytest_asyncio
+from spotsync.tui import SpotSyncApp
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests on uvloop, whose faster scheduling speeds up pilot pauses."""
+        return {"uvloop": uvloop.new_event_loop}
+
+
+def pytest_addoption(parser):
+    """Add the option that enables debug-only tests."""
+    parser.addoption(
+        "--run-debug", action="store_true", default=False,
+        help="run tests marked as debug"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip debug-only tests unless --run-debug is given."""
+    if config.getoption("--run-debug"):
+        return
+    skip_debug = pytest.mark.skip(reason="debug-only; pass --run-debug")
+    for item in items:
+        if "debug" in item.keywords:
+            item.add_marker(skip_debug)
+
+
+@pytest_asyncio.fixture(loop_scope="module", scope="module")
+async def spotsync_pilot():
+    """Run one SpotSyncApp per module and share it with its TUI tests."""
+    app = SpotSyncApp()
+    async with app.run_test() as pilot:
+        # Tests only inspect the mounted DOM, so flush pending messages once
+        # rather than waiting for the app to go idle
+        await pilot.pause(0)
+        yield app, pilot
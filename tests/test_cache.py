@@ -0,0 +1,61 @@
+"""Tests for the response cache module."""
+
+import time
+
+import pytest
+from spotsync.cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+    
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Create a ResponseCache backed by a temporary database."""
+        return ResponseCache(tmp_path / "cache.db")
+    
+    def test_roundtrip(self, cache):
+        """Test that stored values are returned unchanged."""
+        value = [{'id': 'track1', 'name': 'Song', 'artists': [{'name': 'Artist'}]}]
+        cache.set("search:5:artist song", value)
+        
+        assert cache.get("search:5:artist song", ttl=60) == value
+    
+    def test_missing_key(self, cache):
+        """Test that unknown keys return None."""
+        assert cache.get("search:5:unknown", ttl=60) is None
+    
+    def test_expired_entry(self, cache, monkeypatch):
+        """Test that entries older than the TTL are ignored."""
+        cache.set("key", ["value"])
+        
+        now = time.time()
+        monkeypatch.setattr(time, "time", lambda: now + 120)
+        
+        assert cache.get("key", ttl=60) is None
+        assert cache.get("key", ttl=600) == ["value"]
+    
+    def test_persistence(self, tmp_path):
+        """Test that entries survive reopening the database."""
+        ResponseCache(tmp_path / "cache.db").set("key", {"a": 1})
+        
+        assert ResponseCache(tmp_path / "cache.db").get("key", ttl=60) == {"a": 1}
+    
+    def test_unusable_path(self, tmp_path):
+        """Test that an unusable database path degrades to an in-memory cache."""
+        path = tmp_path / "missing" / "cache.db"
+        cache = ResponseCache(path)
+        cache.set("key", ["value"])
+        
+        assert cache.get("key", ttl=60) == ["value"]
+        assert ResponseCache(path).get("key", ttl=60) is None
+    
+    def test_memory_eviction(self, tmp_path, monkeypatch):
+        """Test that evicted in-memory entries are reloaded from the database."""
+        monkeypatch.setattr("spotsync.cache.MEMORY_ENTRIES", 2)
+        cache = ResponseCache(tmp_path / "cache.db")
+        for key in ("a", "b", "c"):
+            cache.set(key, key.upper())
+        
+        assert "a" not in cache._memory
+        assert cache.get("a", ttl=60) == "A"
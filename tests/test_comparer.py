@@ -187,4 +187,35 @@ class TestPlaylistComparer:
         # Should match both regardless of case
         assert len(result.matched) == 2
         assert len(result.local_only) == 0
-        assert len(result.spotify_only) == 0
\ No newline at end of file
+        assert len(result.spotify_only) == 0
+    
+    def test_match_without_shared_tokens(self):
+        """Test that tracks sharing no exact token still match on fuzzy similarity."""
+        comparer = PlaylistComparer()
+        
+        local_tracks = [Track(title="Colour")]
+        
+        spotify_tracks = [
+            {"id": "1", "name": "Color", "artists": "Some Artist", "album": "Album 1", "duration_ms": 180000}
+        ]
+        
+        result = comparer.compare_playlists(local_tracks, spotify_tracks)
+        
+        assert len(result.matched) == 1
+        assert len(result.local_only) == 0
+    
+    def test_spotify_tracks_iterable(self):
+        """Test that Spotify tracks can be streamed from a generator."""
+        comparer = PlaylistComparer()
+        
+        local_tracks = [Track(title="Song One", artist="Artist A")]
+        spotify_tracks = (
+            {"id": str(i), "name": name, "artists": "Artist A", "album": "Album", "duration_ms": 180000}
+            for i, name in enumerate(["Song One", "Song Two"])
+        )
+        
+        result = comparer.compare_playlists(local_tracks, spotify_tracks)
+        
+        assert len(result.matched) == 1
+        assert [t["name"] for t in result.spotify_only] == ["Song Two"]
+        assert result.total_spotify == 2
@@ -65,6 +65,17 @@ class TestTrackMatcher:
         assert result.spotify_id in ['track1', 'track2']
         assert result.confidence > 0.7
     
+    def test_best_candidate_below_threshold(self, matcher, spotify_results):
+        """Test that the closest candidate is reported even when it doesn't match."""
+        candidates = [matcher.prepare_candidate(track) for track in spotify_results]
+        
+        best, score = matcher.best_candidate('Bohemian Rhapsody', 'Freddie', candidates)
+        
+        assert best.spotify_id == 'track1'
+        assert 0 < score < matcher.threshold
+        assert matcher.match_prepared('Bohemian Rhapsody', 'Freddie', candidates) is None
+        assert matcher.best_candidate('Any Song', 'Any Artist', []) == (None, 0.0)
+    
     def test_empty_results(self, matcher):
         """Test with empty Spotify results."""
         result = matcher.match_track('Any Song', 'Any Artist', [])
@@ -153,4 +164,92 @@ class TestTrackMatcher:
         
         assert result is not None
         assert result.spotify_id == '5TOc3JrAmrru8EDwoUXlaf'
-        assert result.confidence >= 0.83  # Should meet threshold despite different order
\ No newline at end of file
+        assert result.confidence >= 0.83  # Should meet threshold despite different order
+    
+    def test_score_matrix_matches_pairwise_scores(self, matcher, spotify_results):
+        """Test that score_matrix agrees exactly with the pairwise scorer."""
+        local_tracks = [
+            ('Bohemian Rhapsody', 'Queen'),
+            ('Risk', 'Bas / FKJ'),
+            ('Song Title', 'Featured Artist'),
+            ('Another Song', None),
+        ]
+        spotify_results = spotify_results + [
+            {'id': 'track4', 'name': 'Risk', 'artists': [{'name': 'FKJ'}, {'name': 'Bas'}]},
+            {'id': 'track5', 'name': 'Song Title', 'artists': [{'name': 'Main Artist'}, {'name': 'Featured Artist'}]},
+            {'id': 'track6', 'name': 'Another Song', 'artists': []},
+        ]
+        candidates = [matcher.prepare_candidate(track) for track in spotify_results]
+        clean_titles = [matcher._clean_string(title) for title, _ in local_tracks]
+        clean_artists = [matcher._clean_string(artist) for _, artist in local_tracks]
+        
+        scores = matcher.score_matrix(clean_titles, clean_artists, candidates)
+        
+        assert scores.shape == (len(local_tracks), len(candidates))
+        for i in range(len(local_tracks)):
+            for j, candidate in enumerate(candidates):
+                assert scores[i, j] == matcher._score_cleaned(
+                    clean_titles[i], clean_artists[i],
+                    candidate.clean_title, candidate.clean_artist
+                )
+    
+    def test_score_early_exit(self, matcher, spotify_results):
+        """Test that skipping the artist comparison never hides a better score."""
+        candidates = [matcher.prepare_candidate(track) for track in spotify_results]
+        local_tracks = [('Bohemian Rhapsody', 'Queen'), ('Another Tune', 'Artist'), ('Risk', 'Bas / FKJ')]
+        
+        for title, artist in local_tracks:
+            clean_title, clean_artist = matcher._clean_string(title), matcher._clean_string(artist)
+            for candidate in candidates:
+                args = (clean_title, clean_artist, candidate.clean_title, candidate.clean_artist)
+                score = matcher._score_cleaned(*args)
+                for beat in (0.0, 0.5, 0.7, 0.9):
+                    early = matcher._score_cleaned(*args, beat=beat)
+                    assert early == score or score <= early <= beat
+    
+    def test_score_upper_bound(self, matcher, spotify_results):
+        """Test that the length-based bound never underestimates a score."""
+        local_tracks = [
+            ('Bohemian Rhapsody', 'Queen'),
+            ('Hi', 'Queen'),
+            ('Another Song', None),
+            ('', None),
+        ]
+        candidates = [matcher.prepare_candidate(track) for track in spotify_results]
+        clean_titles = [matcher._clean_string(title) for title, _ in local_tracks]
+        clean_artists = [matcher._clean_string(artist) for _, artist in local_tracks]
+        
+        bound = matcher.score_upper_bound(clean_titles, clean_artists, candidates)
+        scores = matcher.score_matrix(clean_titles, clean_artists, candidates)
+        
+        assert (bound >= scores - 1e-9).all()
+        assert bound[1].max() < 0.8  # A two-letter title can't match these tracks
+    
+    def test_pruned_scores_keep_matches(self, matcher, spotify_results):
+        """Test that pruning only lowers scores that are below the threshold."""
+        local_tracks = [
+            ('Bohemian Rhapsody', 'Queen'),
+            ('Bohemian Rhapsody Live', 'Queen'),
+            ('Hotel California', 'Queen'),
+            ('Another Song', None),
+        ]
+        candidates = [matcher.prepare_candidate(track) for track in spotify_results]
+        clean_titles = [matcher._clean_string(title) for title, _ in local_tracks]
+        clean_artists = [matcher._clean_string(artist) for _, artist in local_tracks]
+        
+        scores = matcher.score_matrix(clean_titles, clean_artists, candidates)
+        pruned = matcher.score_matrix(clean_titles, clean_artists, candidates, prune=True)
+        
+        above = scores >= matcher.threshold
+        assert above.any()
+        assert (pruned[above] == scores[above]).all()
+        assert (pruned[~above] < matcher.threshold).all()
+        
+    def test_prepare_candidate_cached(self, matcher, spotify_results):
+        """Test that a track returned by several searches is prepared once."""
+        first = matcher.prepare_candidate(spotify_results[0])
+        again = matcher.prepare_candidate(dict(spotify_results[0]))
+        
+        assert again is first
+        assert first.clean_title == 'bohemian rhapsody'
+        assert matcher.prepare_candidate({'name': 'No ID'}) is None
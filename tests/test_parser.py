@@ -62,6 +62,33 @@ class TestM3U8Parser:
             
             Path(f.name).unlink()
     
+    def test_iter_parse_yields_tracks_in_order(self):
+        """Test that iter_parse yields the same tracks as parse, lazily."""
+        content = """#EXTM3U
+#EXTINF:180,Artist Name - Song Title
+/path/to/song.mp3
+#EXTINF:200,Missing Path
+#EXTINF:240,Another Artist - Another Song
+/path/to/another.mp3
+/path/to/Third - Track.mp3
+"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.m3u8', delete=False) as f:
+            f.write(content)
+            f.flush()
+            
+            parser = M3U8Parser()
+            iterator = parser.iter_parse(f.name)
+            
+            first = next(iterator)
+            assert first.title == "Song Title"
+            assert first.file_path == "/path/to/song.mp3"
+            
+            rest = list(iterator)
+            assert [t.title for t in rest] == ["Another Song", "Track"]
+            assert [t.title for t in parser.parse(f.name)] == ["Song Title", "Another Song", "Track"]
+            
+            Path(f.name).unlink()
+    
     def test_parse_invalid_file(self):
         """Test parsing an invalid M3U8 file."""
         content = """Not a valid M3U8 file"""
@@ -136,4 +163,9 @@ class TestM3U8Parser:
         # Test without artist
         track = parser._parse_filename("Just a Title.mp3")
         assert track.artist is None
-        assert track.title == "Just a Title"
\ No newline at end of file
+        assert track.title == "Just a Title"
+    
+    def test_track_query(self):
+        """Test the precomputed Spotify search query."""
+        assert Track(title="Title", artist="Artist").query == "Artist Title"
+        assert Track(title="Just a Title").query == "Just a Title"
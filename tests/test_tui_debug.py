@@ -1,58 +1,69 @@
-#!/usr/bin/env python3
 """
 Test script to debug what the TUI interface actually displays.
+
+Skipped by default; run ``pytest tests/test_tui_debug.py --run-debug -v -s`` to see the widget report.
 """
 
+import sys
+
 import pytest
 from spotsync.tui import SpotSyncApp
 
 
-@pytest.mark.asyncio
-async def test_tui_interface_debug():
-    """Debug test to see what widgets are actually rendered."""
-    app = SpotSyncApp()
-    async with app.run_test() as pilot:
-        # Take a moment to let the app fully load
-        await pilot.pause()
-        
-        # Check the screen stack
-        print(f"Screen stack: {app.screen_stack}")
-        print(f"Current screen: {app.screen}")
-        print(f"Current screen type: {type(app.screen)}")
-        
-        # Check if the Browse button exists
-        try:
-            browse_button = app.query_one("#browse-button")
-            print(f"✓ Browse button found: {browse_button}")
-        except Exception as e:
-            print(f"✗ Browse button NOT found: {e}")
-        
-        # Check if file display exists
-        try:
-            file_display = app.query_one("#file-display")
-            print(f"✓ File display found: {file_display}")
-        except Exception as e:
-            print(f"✗ File display NOT found: {e}")
-        
-        # Check what widgets are actually present in the current screen
-        all_widgets = list(app.screen.query("*"))
-        print(f"\nAll widgets in current screen ({len(all_widgets)}):")
-        for widget in all_widgets:
-            if hasattr(widget, 'id') and widget.id:
-                print(f"  - {widget.__class__.__name__} (id: {widget.id})")
-            else:
-                print(f"  - {widget.__class__.__name__}")
-        
-        # Check what widgets are available at the app level
-        all_app_widgets = list(app.query("*"))
-        print(f"\nAll widgets in app ({len(all_app_widgets)}):")
-        for widget in all_app_widgets:
-            if hasattr(widget, 'id') and widget.id:
-                print(f"  - {widget.__class__.__name__} (id: {widget.id})")
-            else:
-                print(f"  - {widget.__class__.__name__}")
-
-
-if __name__ == "__main__":
-    import asyncio
-    asyncio.run(test_tui_interface_debug())
\ No newline at end of file
+def _widget_report(app: SpotSyncApp) -> str:
+    """Describe the screens and widgets a running app has rendered."""
+    # Check the screen stack
+    report = [
+        f"Screen stack: {app.screen_stack}",
+        f"Current screen: {app.screen}",
+        f"Current screen type: {type(app.screen)}",
+    ]
+
+    # Check if the Browse button exists
+    browse_button = next(iter(app.query("#browse-button")), None)
+    if browse_button is not None:
+        report.append(f"✓ Browse button found: {browse_button}")
+    else:
+        report.append("✗ Browse button NOT found")
+
+    # Check if file display exists
+    file_display = next(iter(app.query("#file-display")), None)
+    if file_display is not None:
+        report.append(f"✓ File display found: {file_display}")
+    else:
+        report.append("✗ File display NOT found")
+
+    # Check what widgets are present in the current screen and at the app level;
+    # with a single screen on the stack both are the same tree, so walk it once
+    screen_widgets = [(type(w).__name__, w.id) for w in app.screen.walk_children()]
+    if len(app.screen_stack) == 1:
+        app_widgets = screen_widgets
+    else:
+        app_widgets = [
+            (type(w).__name__, w.id)
+            for screen in app.screen_stack
+            for w in screen.walk_children()
+        ]
+
+    for title, widgets in (("current screen", screen_widgets), ("app", app_widgets)):
+        report.append(f"\nAll widgets in {title} ({len(widgets)}):")
+        report.extend(
+            f"  - {name}{f' (id: {widget_id})' if widget_id else ''}"
+            for name, widget_id in widgets
+        )
+    return "\n".join(report) + "\n"
+
+
+@pytest.mark.debug
+@pytest.mark.asyncio(loop_scope="module")
+async def test_tui_interface_debug(spotsync_pilot, request):
+    """Debug test to see what widgets are actually rendered (reported with -v)."""
+    app, _ = spotsync_pilot
+    assert next(iter(app.query("#browse-button")), None) is not None
+    assert next(iter(app.query("#file-display")), None) is not None
+
+    # The full report is only worth building when someone will read it
+    if request.config.getoption("verbose") <= 0:
+        return
+    sys.stdout.write(_widget_report(app))
+